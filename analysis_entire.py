@@ -1,7 +1,8 @@
 # analysis_entire.py
 import sys
 import re
-from datetime import datetime, timedelta
+from array import array
+from datetime import timedelta
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
@@ -15,7 +16,7 @@ from PySide6.QtCore import Qt, QModelIndex, QDateTime, QTimer, Slot
 from model import LogListModel
 from br_tab import BRTab
 from db_manager import DBManager
-from worker import VariableLogWorker
+from worker import SearchWorker, VariableLogWorker
 from period_dialog import PeriodDialog
 
 
@@ -46,16 +47,16 @@ class HighlightLogListModel(LogListModel):
         if not index.isValid() or index.row() >= len(self.logs):
             return None
 
-        log = self.logs[index.row()]
+        row = index.row()
 
         if role == Qt.DisplayRole:
-            return log.raw
+            return self.logs.raw(row)
 
         if role == Qt.UserRole:
-            return log.original_index
+            return self.logs.original_index(row)
 
         if self._highlighted_codes:
-            item_code = self._extract_item_code(log.raw)
+            item_code = self._extract_item_code(self.logs.raw(row))
             is_match = item_code in self._highlighted_codes
 
             if role == Qt.BackgroundRole and is_match:
@@ -104,6 +105,11 @@ class AnalysisPage(QWidget):
         self.period_start = QDateTime.currentDateTime().addSecs(-3600)
         self.period_end   = QDateTime.currentDateTime()
 
+        # 검색은 SearchWorker 에서 실행, 이전 세대의 결과는 버림
+        self.search_generation = 0
+        self._search_worker = None
+        self._retired_search_workers = []
+
         self.db = DBManager()
 
         self._build_ui()
@@ -184,11 +190,7 @@ class AnalysisPage(QWidget):
         var_panel, self.log_loading_label_br, self.log_list_br = _make_var_panel()
 
         self.br_tab = BRTab(self)
-        # 페이지네이션 버튼 불필요 — 숨김
-        self.br_tab.prev_btn.hide()
-        self.br_tab.next_btn.hide()
-        self.br_tab.page_label.hide()
-        self.br_tab.tree.setHeaderHidden(True)
+        self.br_tab.tree.horizontalHeader().hide()
         self.br_tab.tree.setFrameShape(QFrame.NoFrame)
 
         self.v_splitter.addWidget(var_panel)
@@ -370,11 +372,11 @@ class AnalysisPage(QWidget):
     # 기간
     # =========================================================
     def _update_period_from_logs(self):
-        times = [log.ts for log in self.variable_logs if log.ts]
-        if not times:
+        span = self.variable_logs.time_range() if self.variable_logs else None
+        if not span:
             return
-        self.period_start = QDateTime(min(times))
-        self.period_end   = QDateTime(max(times))
+        self.period_start = QDateTime(span[0])
+        self.period_end   = QDateTime(span[1])
 
     # =========================================================
     # 검색
@@ -389,29 +391,73 @@ class AnalysisPage(QWidget):
 
         left  = bisect.bisect_left(self.variable_timestamps, start_ts)
         right = bisect.bisect_right(self.variable_timestamps, end_ts)
-        subset = self.variable_logs[left:right]
 
-        result = [
-            log for log in subset
-            if not keyword_lower or keyword_lower in log.raw_lower
+        terms = [keyword_lower] if keyword_lower else []
+        if not self.variable_logs:
+            self._display_logs([])
+        elif not terms:
+            self._display_logs(self.variable_logs.subset(range(left, right)))
+        else:
+            # 결과는 _on_search_rows 가 배치 단위로 추가
+            self._cancel_search()
+            self.log_model.setLogs(self.variable_logs.subset(array("I")))
+            self.log_model.clear_highlight()
+
+        br_search = None
+        if self.br_tab.br_calls:
+            if keyword:
+                def search_brs():
+                    return self.br_tab.search_brs(keyword_lower, start_ts, end_ts)
+                br_search = search_brs
+            else:
+                self.br_tab.show_brs_in_timerange(start_ts, end_ts)
+
+        if terms and (self.variable_logs or br_search):
+            store  = self.variable_logs.store if self.variable_logs else None
+            worker = SearchWorker(self.search_generation, store, terms, [], left, right, br_search)
+            worker.rows_found.connect(self._on_search_rows)
+            worker.brs_found.connect(self._on_search_brs)
+            worker.failed.connect(self._on_search_failed)
+            self._search_worker = worker
+            worker.start()
+
+    def _cancel_search(self):
+        """실행 중인 검색을 중단. 이후 도착하는 결과는 무시."""
+        self.search_generation += 1
+        worker = self._search_worker
+        self._search_worker = None
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+            # 스레드가 끝날 때까지 참조 유지
+            self._retired_search_workers.append(worker)
+        self._retired_search_workers = [
+            w for w in self._retired_search_workers if w.isRunning()
         ]
-        self._display_logs(result)
 
-        if not self.br_tab.br_calls:
+    def _on_search_rows(self, generation, rows):
+        if generation == self.search_generation:
+            self.log_model.appendRows(rows)
+
+    def _on_search_failed(self, generation, message):
+        if generation != self.search_generation:
             return
-        if not keyword:
-            self.br_tab.show_brs_in_timerange(start_ts, end_ts)
+        mw = self.window()
+        if hasattr(mw, "statusBar"):
+            mw.statusBar().showMessage(f"Search failed: {message}", 8000)
+
+    def _on_search_brs(self, generation, br_results):
+        if generation != self.search_generation:
             return
-        br_results = self.br_tab.search_brs(keyword_lower, start_ts, end_ts)
         if br_results:
             self.br_tab.populate_tree_from_executions(br_results)
         else:
-            self.br_tab.tree.clear()
+            self.br_tab.clear_view()
 
     # =========================================================
     # 로그 표시
     # =========================================================
     def _display_logs(self, logs):
+        self._cancel_search()
         self.log_model.setLogs(logs or [])
         self.log_model.clear_highlight()
 
@@ -517,6 +563,7 @@ class AnalysisPage(QWidget):
         self.search_input.blockSignals(False)
 
         # 전체 로그 표시 (필터링 없음)
+        self._cancel_search()
         self.log_model.setLogs(self.variable_logs)
 
         # Variable 로그 하이라이팅
@@ -583,25 +630,24 @@ class AnalysisPage(QWidget):
 
         if seq["type"] == "B":
             core_set   = set(seq.get("core_indices", []))
-            final_logs = []
+            final_rows = []
             for log in logs_in_range:
                 item_c, signal = self._parse_item_signal(log.raw)
                 if item_c != item_code:
                     continue
                 if log.original_index in core_set:
-                    final_logs.append(log)
+                    final_rows.append(log.row)
                     continue
                 if "B_TRIGGER_REPORT" in (signal or ""):
                     continue
-                final_logs.append(log)
-            final_logs.sort(key=lambda x: x.ts or datetime.min)
-            self._display_logs(final_logs)
+                final_rows.append(log.row)
+            self._display_logs(self.variable_logs.subset(final_rows))
         else:
             subset = [
-                log for log in logs_in_range
+                log.row for log in logs_in_range
                 if self._parse_item_signal(log.raw)[0] == item_code
             ]
-            self._display_logs(subset)
+            self._display_logs(self.variable_logs.subset(subset))
 
         # BR 하이라이팅
         if not self.br_tab.br_calls:
@@ -609,11 +655,7 @@ class AnalysisPage(QWidget):
         self.br_tab.show_all_brs()
         expected_brs = set(self.db.get_brs_for_item(item_code))
         if expected_brs:
-            executions = [
-                e for e in self.br_tab.br_calls
-                if e["br_name"] in expected_brs
-                and (st_ts - 1) <= int(e["timestamp"].timestamp()) <= (et_ts + 1)
-            ]
+            executions = self.br_tab.executions_in_seconds(st_ts - 1, et_ts + 1, expected_brs)
             if executions:
                 self.br_tab.highlight_br_executions(executions)
 
@@ -632,6 +674,7 @@ class AnalysisPage(QWidget):
         self.search_input.blockSignals(False)
 
         if self.log_model.logs != self.variable_logs:
+            self._cancel_search()
             self.log_model.setLogs(self.variable_logs)
             self.log_model.clear_highlight()
 
@@ -670,6 +713,7 @@ class AnalysisPage(QWidget):
         self.pending_br_jump_ts    = None
         self.pending_br_highlight  = None
 
+        self._cancel_search()
         self.log_model.setLogs([])
         self.log_model.clear_highlight()
         self.item_list.clear()
@@ -682,18 +726,7 @@ class AnalysisPage(QWidget):
         self.period_start = QDateTime.currentDateTime().addSecs(-3600)
         self.period_end   = QDateTime.currentDateTime()
 
-        self.br_tab.tree.clear()
-        self.br_tab.br_calls            = []
-        self.br_tab.br_name_index       = {}
-        self.br_tab.execution_item_map  = {}
-        self.br_tab.sorted_exec_times   = []
-        self.br_tab.sorted_executions   = []
-        self.br_tab.execution_by_second = {}
-        self.br_tab.highlighted_item    = None
-        self.br_tab.last_displayed_ids  = None
-        self.br_tab._all_executions     = []
-        self.br_tab._current_page       = 0
-        self.br_tab.page_label.setText("Page 1 of 1")
+        self.br_tab.reset()
 
         self.db.clear_all()
 
@@ -1,6 +1,13 @@
 ﻿#app.py
+import multiprocessing
 import sys
+
+if __name__ == "__main__":
+    # Parse pool children of the frozen app start here and never import Qt
+    multiprocessing.freeze_support()
+
 import re
+from array import array
 from datetime import datetime, timedelta
 
 from PySide6.QtWidgets import (
@@ -15,10 +22,22 @@ from PySide6.QtCore import QDateTime, Qt, QAbstractListModel, QModelIndex
 from parser import load_log_file
 from period_dialog import PeriodDialog
 from br_tab import BRTab
+from latency_tab import LatencyTab
+from audit_tab import AuditTab
+from br_audit import correlate
+from handshake_stats import load_timeouts, timeout_for
 from db_manager import DBManager
 from PySide6.QtCore import QTimer
 from model import LogListModel
-from worker import VariableLogWorker
+from log_store import remap_rows
+from worker import SearchWorker, VariableLogWorker, VariableTailWorker
+import parse_cache
+
+# How often follow mode checks the open logs for appended lines
+FOLLOW_INTERVAL_MS = 1000
+
+# Sequence tab category listing B handshakes that went wrong
+ANOMALY_CATEGORY = "Anomalies"
 
 class LogViewer(QMainWindow):
     def __init__(self):
@@ -30,6 +49,7 @@ class LogViewer(QMainWindow):
         self.setWindowIcon(QIcon("icon.ico"))
 
         self.KNOWN_EQUIPMENTS = ["MIX", "COT", "ROL", "RWD", "TRS"]
+        load_timeouts()
 
         self.variable_logs_loading_finished = False
         self.br_logs_loading_finished = False
@@ -149,12 +169,27 @@ class LogViewer(QMainWindow):
         self.seq_tree.itemClicked.connect(self.on_sequence_clicked)
         self.right_tabs.addTab(self.seq_tree, "Sequence")
 
+        self.latency_tab = LatencyTab()
+        self.latency_tab.sequence_requested.connect(self.show_sequence)
+        self.latency_tab.timeouts_changed.connect(self.on_timeouts_changed)
+        self.right_tabs.addTab(self.latency_tab, "Latency")
+
+        self.audit_tab = AuditTab()
+        self.audit_tab.run_requested.connect(self.run_br_audit)
+        self.audit_tab.sequence_requested.connect(self.show_sequence)
+        self.right_tabs.addTab(self.audit_tab, "BR Audit")
+
         self.pending_variable_jump = None
 
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self._execute_search)
 
+        # Searches run in a SearchWorker; results from superseded ones are dropped
+        self.search_generation = 0
+        self._search_worker = None
+        self._retired_search_workers = []
+
         # -------------------
         # Layout
         # -------------------
@@ -170,6 +205,15 @@ class LogViewer(QMainWindow):
 
         self.db = DBManager()
 
+        # Follow mode (parse lines appended to the open logs)
+        self.variable_log_path = None
+        self.variable_state = None
+        self._var_tail_worker = None
+        self._pending_var_tail = None   # (state, result, end) held back by a search
+        self._follow_timer = QTimer(self)
+        self._follow_timer.setInterval(FOLLOW_INTERVAL_MS)
+        self._follow_timer.timeout.connect(self.poll_appended_logs)
+
         self.create_menu()
         self.statusBar().showMessage("Ready")
 
@@ -219,6 +263,18 @@ class LogViewer(QMainWindow):
 
         file_menu.addSeparator()
 
+        # 3️⃣ Keep parsing lines the equipment appends
+        follow_action = QAction("Follow Appended Lines", self)
+        follow_action.setCheckable(True)
+        follow_action.toggled.connect(self.set_follow_mode)
+        file_menu.addAction(follow_action)
+
+        clear_cache_action = QAction("Clear Parse Cache", self)
+        clear_cache_action.triggered.connect(self.clear_parse_cache)
+        file_menu.addAction(clear_cache_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -230,6 +286,139 @@ class LogViewer(QMainWindow):
         help_menu.addAction(about_action)
 
 
+    def set_follow_mode(self, enabled):
+        self.br_tab.following = enabled
+        if enabled:
+            self._follow_timer.start()
+            self.statusBar().showMessage("Following appended log lines.", 4000)
+        else:
+            self._follow_timer.stop()
+            self.statusBar().showMessage("Stopped following log lines.", 4000)
+
+    def search_running(self):
+        """True while a search thread, current or superseded, may still read the logs."""
+        workers = [self._search_worker, *self._retired_search_workers]
+        return any(w is not None and w.isRunning() for w in workers)
+
+    def poll_appended_logs(self):
+        # Searches read the store and BR list without locks, so appended
+        # lines are merged only between searches
+        if self.search_running():
+            return
+
+        pending, self._pending_var_tail = self._pending_var_tail, None
+        if pending is not None and pending[0] is self.variable_state:
+            self._merge_variable_tail(*pending[1:])
+
+        worker = self._var_tail_worker
+        if self.variable_state is not None and not (worker and worker.isRunning()):
+            self._var_tail_worker = VariableTailWorker(self.variable_log_path, self.variable_state)
+            self._var_tail_worker.finished.connect(self._on_variable_tail_ready)
+            self._var_tail_worker.start()
+
+        self.br_tab.poll_appended_logs()
+
+    def _on_variable_tail_ready(self, result, end):
+        state = self.variable_state
+        if end is None or state is None or self._var_tail_worker.state is not state:
+            return
+
+        if self.search_running():
+            # Merged by the first poll after the search
+            self._pending_var_tail = (state, result, end)
+            return
+        self._merge_variable_tail(result, end)
+
+    def _merge_variable_tail(self, result, end):
+        state = self.variable_state
+        if end < state.offset:
+            # File was truncated or replaced: parse it again
+            self.load_variable_log(self.variable_log_path)
+            return
+
+        store = state.store
+        old_count = len(store)
+        old_seq_count = sum(len(v) for v in state.builder.sequences.values())
+        old_handshakes = (state.builder.dropped_count, len(state.builder.active))
+
+        moved = state.append(result, end)
+        added = len(store) - old_count
+        if not added:
+            return
+
+        if store.file_backed:
+            store.attach(self.variable_log_path)
+
+        shown = self.log_model.logs
+        showing_all = shown is self.variable_logs
+        self.variable_logs = store.view()
+        self.variable_timestamps = store.ts
+        self.sequences = state.builder.sequences
+        self.item_categories = state.item_categories
+
+        # Item views hold copies of the state's row arrays: renumber the
+        # rows they have and add the new ones at the end
+        new_items = []
+        moved_shown = False
+        for code, rows in state.item_rows.items():
+            view = self.item_index.get(code)
+            if view is None:
+                self.item_index[code] = store.view(rows[:])
+                new_items.append(code)
+                continue
+            count = len(view.rows)
+            if moved is not None:
+                if view is shown:
+                    self.log_model.renumberRows(rows[:count])
+                    moved_shown = True
+                else:
+                    view.rows[:] = rows[:count]
+            if len(rows) > count:
+                if view is shown:
+                    self.log_model.appendRows(rows[count:])
+                else:
+                    view.rows.extend(rows[count:])
+
+        if showing_all:
+            if moved is None:
+                self.log_model.appendLogs(self.variable_logs)
+            else:
+                self.display_logs(self.variable_logs)
+            self.update_period_from_logs()
+        elif moved is not None and shown and not moved_shown:
+            # Period, search and sequence views keep their lines; only
+            # the row numbers of those lines changed
+            self.log_model.renumberRows(remap_rows(shown.rows, *moved))
+
+        if sum(len(v) for v in self.sequences.values()) != old_seq_count:
+            self.populate_sequence_tree(force=True)
+            self.latency_tab.refresh()
+        elif (state.builder.dropped_count, len(state.builder.active)) != old_handshakes:
+            self.populate_sequence_tree(force=True)
+
+        if new_items and self.current_tab == "Variable Logs":
+            self.build_item_list(force=True)
+
+        self.statusBar().showMessage(f"+{added:,} variable log lines.", 4000)
+
+    def run_br_audit(self):
+        """Correlate every sequence with the BR executions in its window."""
+        if not self.sequences or not self.br_tab.br_calls:
+            self.statusBar().showMessage("Load a Variable log and a BR log to audit.", 4000)
+            return
+
+        rows = correlate(
+            self.sequences, self.br_tab.br_calls, self.br_tab.time_index,
+            self.db.get_item_brs()
+        )
+        self.audit_tab.set_rows(rows, self.db.get_item_name)
+
+    def clear_parse_cache(self):
+        freed = parse_cache.clear()
+        self.statusBar().showMessage(
+            f"Cleared parse cache ({freed / (1024 * 1024):,.1f} MB).", 4000
+        )
+
     def load_br_log(self, path):
         valid = False
         with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
@@ -351,7 +540,10 @@ class LogViewer(QMainWindow):
         self.log_list.hide()
 
         # 🔥 Pass filepath, not logs
-        self._var_worker = VariableLogWorker(path)
+        self.variable_log_path = path
+        self._var_worker = VariableLogWorker(
+            path, complete_lines=self._follow_timer.isActive()
+        )
         self._var_worker.finished.connect(self._on_variable_log_ready)
         self._var_worker.start()
 
@@ -376,6 +568,7 @@ class LogViewer(QMainWindow):
         self.current_equipment = current_equipment
         self.sequences = sequences
         self.item_categories = item_categories  
+        self.variable_state = self._var_worker.state
 
         # Dynamic suffix items for DB
         dynamic_items = {}
@@ -389,6 +582,7 @@ class LogViewer(QMainWindow):
         self.display_logs(self.variable_logs)
         self.update_period_from_logs()
         self.populate_sequence_tree()
+        self.latency_tab.set_timings(self.variable_state.builder.timings, self.db.get_item_name)
 
         if self.current_tab == "Variable Logs":
             self.build_item_list()
@@ -422,13 +616,13 @@ class LogViewer(QMainWindow):
     # Period Handling
     # -------------------
     def update_period_from_logs(self):
-        times = [log.ts for log in self.variable_logs if log.ts]
+        span = self.variable_logs.time_range() if self.variable_logs else None
 
-        if not times:
+        if not span:
             return
 
-        self.period_start = QDateTime(min(times))
-        self.period_end = QDateTime(max(times))
+        self.period_start = QDateTime(span[0])
+        self.period_end = QDateTime(span[1])
         self.update_period_button()
 
     def update_period_button(self):
@@ -447,6 +641,7 @@ class LogViewer(QMainWindow):
     # Display Logs
     # -------------------
     def display_logs(self, logs):
+        self.cancel_search()
         if not logs:
             self.log_model.setLogs([])
             return
@@ -472,37 +667,68 @@ class LogViewer(QMainWindow):
 
         left  = bisect.bisect_left(self.variable_timestamps, start_ts)
         right = bisect.bisect_right(self.variable_timestamps, end_ts)
-        subset = self.variable_logs[left:right]
-
-        result = []
-        for log in subset:
-            raw_lower = log.raw_lower
-
-            # AND: every term must match
-            if and_terms and not all(t in raw_lower for t in and_terms):
-                continue
 
-            # OR: at least one term must match (skip check if no OR terms)
-            if or_terms and not any(t in raw_lower for t in or_terms):
-                continue
-
-            result.append(log)
-
-        self.display_logs(result)
+        # AND: every term must match, OR: at least one term must match
+        searching = bool(and_terms or or_terms)
+        if not self.variable_logs:
+            self.display_logs([])
+        elif not searching:
+            self.display_logs(self.variable_logs.subset(range(left, right)))
+        else:
+            # Matches are streamed in by _on_search_rows
+            self.cancel_search()
+            self.log_model.setLogs(self.variable_logs.subset(array("I")))
+            self.br_tab.clear_highlight()
 
         # BR sync
-        if not self.br_tab.br_calls:
-            return
-
-        if not and_terms and not or_terms:
-            self.br_tab.show_brs_in_timerange(start_ts, end_ts)
+        br_search = None
+        if self.br_tab.br_calls:
+            if searching:
+                def search_brs():
+                    return self.br_tab.search_brs_multi(and_terms, or_terms, start_ts, end_ts)
+                br_search = search_brs
+            else:
+                self.br_tab.show_brs_in_timerange(start_ts, end_ts)
+
+        if searching and (self.variable_logs or br_search):
+            store = self.variable_logs.store if self.variable_logs else None
+            worker = SearchWorker(
+                self.search_generation, store, and_terms, or_terms, left, right, br_search
+            )
+            worker.rows_found.connect(self._on_search_rows)
+            worker.brs_found.connect(self._on_search_brs)
+            worker.failed.connect(self._on_search_failed)
+            self._search_worker = worker
+            worker.start()
+
+    def cancel_search(self):
+        """Supersede the running search; anything it still emits is ignored."""
+        self.search_generation += 1
+        worker = self._search_worker
+        self._search_worker = None
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+            # Keep a reference until the thread has returned
+            self._retired_search_workers.append(worker)
+        self._retired_search_workers = [
+            w for w in self._retired_search_workers if w.isRunning()
+        ]
+
+    def _on_search_rows(self, generation, rows):
+        if generation == self.search_generation:
+            self.log_model.appendRows(rows)
+
+    def _on_search_failed(self, generation, message):
+        if generation == self.search_generation:
+            self.statusBar().showMessage(f"Search failed: {message}", 8000)
+
+    def _on_search_brs(self, generation, br_results):
+        if generation != self.search_generation:
             return
-
-        br_results = self.br_tab.search_brs_multi(and_terms, or_terms, start_ts, end_ts)
         if br_results:
             self.br_tab.populate_tree_from_executions(br_results)
         else:
-            self.br_tab.tree.clear()
+            self.br_tab.clear_view()
 
     # -------------------
     # Sequence Logic
@@ -515,15 +741,6 @@ class LogViewer(QMainWindow):
         except:
             return None, None
 
-    def parse_value(self, raw):
-        try:
-            if " : " in raw:
-                return raw.rsplit(" : ", 1)[1].strip()
-        except:
-            pass
-
-        return None
-
     def merge_overlapping_sequences(self):
         for item, seqs in self.sequences.items():
 
@@ -554,135 +771,6 @@ class LogViewer(QMainWindow):
             # 🔥 rebuild list (keep W untouched)
             self.sequences[item] = merged + other_seqs
 
-    def build_sequences(self):
-        self.sequences = {}
-
-        active = {}
-        # item -> {
-        #   "start": datetime,
-        #   "conf_on": bool,
-        #   "b_off": bool
-        # }
-
-        # O(log n) lookup structures
-        b_intervals = {}   # item -> sorted list of (start_ts, end_ts) for B sequences
-        w_timestamps = {}  # item -> set of datetime for W deduplication
-
-        buffer_sec = 1
-        import bisect
-
-        for log in self.variable_logs:
-
-            ts = log.ts
-            if not ts:
-                continue
-
-            item, signal = self.parse_item_signal(log.raw)
-            val = self.parse_value(log.raw)
-
-            if not item or not signal:
-                continue
-
-            # =====================================================
-            # TYPE W: W_TRIGGER_REPORT (instant)
-            # =====================================================
-            if "W_TRIGGER_REPORT" in signal:
-
-                ts_val = ts.timestamp()
-                lo = ts_val - buffer_sec
-                hi = ts_val + buffer_sec
-
-                # O(log n) overlap check against known B intervals
-                intervals = b_intervals.get(item, [])
-                idx = bisect.bisect_left(intervals, (lo,))
-
-                inside_b = False
-                for iv_start, iv_end in intervals[max(0, idx - 1): idx + 2]:
-                    if iv_start <= hi and iv_end >= lo:
-                        inside_b = True
-                        break
-
-                if inside_b:
-                    continue
-
-                # O(1) duplicate check
-                seen_w = w_timestamps.setdefault(item, set())
-                if ts in seen_w:
-                    continue
-                seen_w.add(ts)
-
-                self.sequences.setdefault(item, []).append({
-                    "start": ts,
-                    "end": ts,
-                    "type": "W"
-                })
-                continue
-
-            # =====================================================
-            # TYPE B: B_TRIGGER_REPORT (strict 4-step sequence)
-            # =====================================================
-
-            # Step 1: B ON (not CONF)
-            if ("B_TRIGGER_REPORT_CONF" not in signal
-                    and "B_TRIGGER_REPORT" in signal
-                    and val == "ON"):
-
-                active[item] = {
-                    "start": ts,
-                    "conf_on": False,
-                    "b_off": False
-                }
-                continue
-
-            if item not in active:
-                continue
-
-            seq = active[item]
-
-            # Step 2: CONF ON
-            if "B_TRIGGER_REPORT_CONF" in signal and val == "ON":
-                seq["conf_on"] = True
-                continue
-
-            # Step 3: B OFF
-            if ("B_TRIGGER_REPORT_CONF" not in signal
-                    and "B_TRIGGER_REPORT" in signal
-                    and val == "OFF"):
-                seq["b_off"] = True
-                continue
-
-            # Step 4: CONF OFF → sequence complete
-            if "B_TRIGGER_REPORT_CONF" in signal and val == "OFF":
-
-                if seq["conf_on"] and seq["b_off"]:
-
-                    new_start = seq["start"] - timedelta(seconds=buffer_sec)
-                    new_end   = ts           + timedelta(seconds=buffer_sec)
-
-                    existing = self.sequences.setdefault(item, [])
-
-                    # Evict any W events that fall inside this B window
-                    existing[:] = [
-                        s for s in existing
-                        if not (
-                            s["type"] == "W"
-                            and new_start <= s["start"] <= new_end
-                        )
-                    ]
-
-                    existing.append({
-                        "start": seq["start"],
-                        "end":   ts,
-                        "type":  "B"
-                    })
-
-                    # Register interval for future O(log n) W overlap checks
-                    interval = (seq["start"].timestamp(), ts.timestamp())
-                    item_intervals = b_intervals.setdefault(item, [])
-                    bisect.insort(item_intervals, interval)
-
-                active.pop(item, None)
-
     def populate_sequence_tree(self, force=False):
         if hasattr(self, "sequence_tree_built") and self.sequence_tree_built and not force:
             return
@@ -727,9 +815,42 @@ class LogViewer(QMainWindow):
 
                 parent.addChild(child)
 
+        self.add_anomaly_nodes()
+
         self.seq_tree.setUpdatesEnabled(True)
         self.sequence_tree_built = True
 
+    def on_timeouts_changed(self):
+        # Timed-out and stuck handshakes are judged by the item timeouts
+        if self.variable_state is not None:
+            self.populate_sequence_tree(force=True)
+
+    def add_anomaly_nodes(self):
+        """Overwritten, incomplete, timed-out and stuck B handshakes, under their own category."""
+        if self.variable_state is None:
+            return
+
+        anomalies = self.variable_state.builder.anomalies(timeout_for)
+        if not anomalies:
+            return
+
+        from PySide6.QtGui import QBrush, QColor
+        group = QTreeWidgetItem([ANOMALY_CATEGORY])
+        self.seq_tree.addTopLevelItem(group)
+
+        for item_code, seqs in sorted(anomalies.items()):
+            item_name = self.db.get_item_name(item_code)
+            parent = QTreeWidgetItem([f"{item_name or item_code} ({len(seqs)})"])
+            parent.setData(0, Qt.UserRole, item_code)
+            group.addChild(parent)
+
+            for seq in seqs:
+                label = f"[{seq['type']}] {seq['start'].strftime('%Y-%m-%d %H:%M:%S')}"
+                child = QTreeWidgetItem([label])
+                child.setData(0, Qt.UserRole, seq)
+                child.setForeground(0, QBrush(QColor("red")))
+                parent.addChild(child)
+
     from datetime import datetime
 
     def to_datetime_safe(self, value):
@@ -755,10 +876,15 @@ class LogViewer(QMainWindow):
         if not isinstance(seq, dict):
             return
 
+        self.show_sequence(item_code, seq)
+
+    def show_sequence(self, item_code, seq):
+        """Show an item's W or B sequence (or B handshake anomaly) in the log view and its BRs."""
         st = seq["start"]
         et = seq["end"]
 
-        if seq["type"] == "B":
+        # B sequences and anomalies are handshakes with core lines
+        if seq["type"] != "W":
             buffer_sec = 1
             st = seq["start"] - timedelta(seconds=buffer_sec)
             et = seq["end"] + timedelta(seconds=buffer_sec)
@@ -794,10 +920,11 @@ class LogViewer(QMainWindow):
         # =====================================================
         # 🔴 B SEQUENCE HANDLING
         # =====================================================
-        if seq["type"] == "B":
+        if seq["type"] != "W":
             core_set = set(seq.get("core_indices", []))
 
-            final_logs = []
+            # Rows in range are already in timestamp order
+            final_rows = []
             for log in logs_in_range:
                 item_c, signal = self.parse_item_signal(log.raw)
 
@@ -806,7 +933,7 @@ class LogViewer(QMainWindow):
 
                 # Always include this sequence's exact core logs
                 if log.original_index in core_set:
-                    final_logs.append(log)
+                    final_rows.append(log.row)
                     continue
 
                 # Drop any B/CONF logs that aren't part of THIS sequence
@@ -814,20 +941,19 @@ class LogViewer(QMainWindow):
                     continue
 
                 # Include non-B context (W events, IDs, etc.)
-                final_logs.append(log)
+                final_rows.append(log.row)
 
-            final_logs.sort(key=lambda x: x.ts or datetime.min)
-            self.display_logs(final_logs)
+            self.display_logs(self.variable_logs.subset(final_rows))
 
         # =====================================================
         # 🟢 W SEQUENCE
         # =====================================================
         else:
             subset = [
-                log for log in logs_in_range
+                log.row for log in logs_in_range
                 if self.parse_item_signal(log.raw)[0] == item_code
             ]
-            self.display_logs(subset)
+            self.display_logs(self.variable_logs.subset(subset))
 
         # ---------------------------------
         # BR handling (unchanged)
@@ -844,11 +970,7 @@ class LogViewer(QMainWindow):
             start = st_ts - buffer_sec
             end = et_ts + buffer_sec
 
-            executions_to_highlight = [
-                e for e in self.br_tab.br_calls
-                if e["br_name"] in expected_brs
-                and start <= int(e["timestamp"].timestamp()) <= end
-            ]
+            executions_to_highlight = self.br_tab.executions_in_seconds(start, end, expected_brs)
 
             if executions_to_highlight:
                 if self.left_tabs.currentWidget() == self.br_tab:
@@ -1087,11 +1209,9 @@ class LogViewer(QMainWindow):
 
         for br_name, logs_for_br in self.br_tab.full_br_index.items():
 
-            for ts, log in logs_for_br:
-                ts_val = ts.timestamp()
-
+            for ts_val, log in logs_for_br:
                 if start_ts <= ts_val <= end_ts:
-                    matched.append((ts, log))
+                    matched.append((ts_val, log))
 
         # ----------------------------
         # 3️ Sort by timestamp
@@ -1178,60 +1298,37 @@ class LogViewer(QMainWindow):
     
 
     def jump_br_view_to_timestamp(self, ts):
-        if not hasattr(self.br_tab, "sorted_exec_times"):
-            return
-
-        times = self.br_tab.sorted_exec_times
-        executions = self.br_tab.sorted_executions
-
-        if not times:
-            return
-
-        import bisect
-        idx = bisect.bisect_left(times, ts)
-
-        candidates = []
-        if idx < len(times):
-            candidates.append(idx)
-        if idx > 0:
-            candidates.append(idx - 1)
-
-        best = None
-        best_diff = float("inf")
-
-        for i in candidates:
-            diff = abs(times[i] - ts)
-            if diff < best_diff:
-                best_diff = diff
-                best = executions[i]
-
-        if best:
-            self.br_tab.jump_to_execution(best)
+        pos = self.br_tab.time_index.nearest(ts)
+        if pos is not None:
+            self.br_tab.jump_to_execution(self.br_tab.br_calls[pos])
 
     def jump_variable_view_to_timestamp(self, ts):
         if not self.variable_logs:
             return
 
         target_ts = int(ts.timestamp())
+        times = self.variable_timestamps
 
         closest_idx = None
         closest_diff = float("inf")
 
         # ----------------------------
-        # Find closest log index
+        # Find closest log index (timestamps are sorted)
         # ----------------------------
-        for i, log in enumerate(self.variable_logs):
+        import bisect
+        idx = bisect.bisect_left(times, target_ts)
 
-            log_ts = log.ts
-            if not log_ts:
+        for i in (idx - 1, idx):
+            if not (0 <= i < len(times)) or not times[i]:
                 continue
 
-            log_sec = int(log_ts.timestamp())
+            log_sec = int(times[i])
             diff = abs(log_sec - target_ts)
 
             if diff < closest_diff:
                 closest_diff = diff
-                closest_idx = i
+                # First log of that second
+                closest_idx = bisect.bisect_left(times, log_sec)
 
         if closest_idx is None:
             return
@@ -1337,6 +1434,8 @@ class LogViewer(QMainWindow):
         self.br_names = []
         self.variable_logs_loading_finished = False
         self.br_logs_loading_finished = False
+        self.variable_state = None
+        self.cancel_search()
     
         # Reset cache flags
         self.br_list_built = False
@@ -1355,6 +1454,8 @@ class LogViewer(QMainWindow):
         self.log_model.setLogs([])
         self.item_list.clear()
         self.seq_tree.clear()
+        self.latency_tab.set_timings(None)
+        self.audit_tab.set_rows(None)
     
         # Clear search
         self.search_and_input.blockSignals(True)
@@ -1370,26 +1471,12 @@ class LogViewer(QMainWindow):
         self.update_period_button()
     
         # Clear BR tab
-        self.br_tab.tree.clear()
-        self.br_tab.br_calls = []
-        self.br_tab.br_name_index = {}
-        self.br_tab.execution_item_map = {}
-        self.br_tab.sorted_exec_times = []
-        self.br_tab.sorted_executions = []
-        self.br_tab.execution_by_second = {}
-        self.br_tab.highlighted_item = None
-        self.br_tab.last_displayed_ids = None
-        self.br_tab._all_executions = []
-        self.br_tab._current_page = 0
-        self.br_tab.page_label.setText("Page 1 of 1")
+        self.br_tab.reset()
     
         # Clear database
         self.db.clear_all()
 
 if __name__ == "__main__":
-    import multiprocessing
-    multiprocessing.freeze_support()
-
     app = QApplication(sys.argv)
     w = LogViewer()
     w.show()
@@ -0,0 +1,135 @@
+# audit_tab.py
+"""
+BR audit view: every sequence of an item with expected BRs, with the BR
+executions that matched, the expected BRs that did not fire and the
+unexpected ones, from br_audit.correlate().
+
+Columns sort on click; clicking a row asks for its sequence through
+sequence_requested.
+"""
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableView,
+    QAbstractItemView, QHeaderView,
+)
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex
+
+_COLUMNS = ["Item", "Type", "Start", "End", "Matched", "Missing", "Extra", "Missing BRs"]
+
+
+def _time(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _count(key):
+    return lambda r: len(r[key])
+
+
+# Column → (display text, sort key) functions of a report row
+_CELLS = (
+    (lambda r: r["name"], lambda r: r["name"]),
+    (lambda r: r["sequence"]["type"], lambda r: r["sequence"]["type"]),
+    (lambda r: _time(r["sequence"]["start"]), lambda r: r["sequence"]["start"]),
+    (lambda r: _time(r["sequence"]["end"]), lambda r: r["sequence"]["end"]),
+    (lambda r: f"{len(r['matched']):,}", _count("matched")),
+    (lambda r: f"{len(r['missing']):,}", _count("missing")),
+    (lambda r: f"{len(r['extra']):,}", _count("extra")),
+    (lambda r: ", ".join(sorted(r["missing"])), _count("missing")),
+)
+_MISSING_COLUMN = 5
+
+
+class AuditModel(QAbstractTableModel):
+    """Table model over correlate() rows, each with a display "name" added."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return _COLUMNS[section]
+        return None
+
+    def data(self, index, role):
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            return _CELLS[index.column()][0](self.rows[index.row()])
+
+        if role == Qt.TextAlignmentRole and 4 <= index.column() <= 6:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+
+        return None
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.rows.sort(key=_CELLS[column][1], reverse=order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class AuditTab(QWidget):
+    run_requested = Signal()
+    sequence_requested = Signal(str, object)   # item code, sequence dict
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        self.run_button = QPushButton("Run Audit")
+        self.run_button.clicked.connect(self.run_requested)
+        top.addWidget(self.run_button)
+        self.summary_label = QLabel("")
+        top.addWidget(self.summary_label, 1)
+        layout.addLayout(top)
+
+        self.model = AuditModel()
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSortingEnabled(True)
+        self.table.clicked.connect(self.on_row_clicked)
+        layout.addWidget(self.table, 1)
+
+    def set_rows(self, rows, item_name=None):
+        """Show correlate() rows; item_name(code) gives display names."""
+        if not rows:
+            self.model.setRows([])
+            self.summary_label.setText("" if rows is None else "No sequences with expected BRs.")
+            return
+
+        names = {}
+        for row in rows:
+            item = row["item"]
+            if item not in names:
+                names[item] = (item_name(item) if item_name else None) or item
+            row["name"] = names[item]
+
+        self.model.setRows(rows)
+        # Sequences with missing BRs first
+        self.table.sortByColumn(_MISSING_COLUMN, Qt.DescendingOrder)
+        self.summary_label.setText(
+            f"{len(rows):,} sequences · "
+            f"{sum(1 for r in rows if r['missing']):,} with missing BRs · "
+            f"{sum(1 for r in rows if r['extra']):,} with extras"
+        )
+
+    def on_row_clicked(self, index):
+        row = self.model.rows[index.row()]
+        self.sequence_requested.emit(row["item"], row["sequence"])
@@ -0,0 +1,105 @@
+# br_audit.py
+"""
+Sequence ↔ BR correlation over a whole log.
+
+correlate() joins every sequence of an item with expected BRs (the
+item_brs mapping of DBManager) to the BR executions in its window, in one
+sweep over both in time order: sequence windows open as the sweep reaches
+their start and close once it passes their end, and each execution is
+handed to the open windows that expect its rule. The window is the one a
+click on the sequence highlights (br_window), so the report agrees with
+the Sequence tab.
+
+An execution no open window expects is an extra of every open window;
+one outside all windows is not reported.
+"""
+import heapq
+import math
+from itertools import count
+
+# Seconds the BR highlight of a sequence reaches past its start and end
+BR_BUFFER_SEC = 1
+
+
+def br_window(seq, buffer_sec=BR_BUFFER_SEC):
+    """(first, last) whole second of the BR executions that belong to seq.
+
+    B handshakes and their anomalies are widened once more, as the log
+    view around them is.
+    """
+    pad = buffer_sec if seq["type"] == "W" else 2 * buffer_sec
+    return (
+        math.ceil(seq["start"].timestamp()) - pad,
+        math.floor(seq["end"].timestamp()) + pad,
+    )
+
+
+def correlate(sequences, br_calls, time_index, item_brs, buffer_sec=BR_BUFFER_SEC):
+    """One row per sequence of an item in item_brs, ordered by window start.
+
+    Rows are dicts of "item", "sequence", "expected" (set of br_names),
+    "matched" and "extra" (executions in time order) and "missing"
+    (expected br_names that did not fire in the window). Rows share the
+    expected sets of item_brs, and missing is one of them when nothing
+    matched, so treat both as read-only.
+    """
+    rows = []
+    for item, seqs in sequences.items():
+        expected = item_brs.get(item)
+        if not expected:
+            continue
+        for seq in seqs:
+            first, last = br_window(seq, buffer_sec)
+            rows.append((first, last, {
+                "item": item, "sequence": seq, "expected": expected,
+                "matched": [], "extra": [],
+            }))
+    rows.sort(key=lambda r: r[0])
+
+    pending = iter(rows)
+    upcoming = next(pending, None)
+    closing = []       # (last second, tiebreak, first unexplained, row) of open windows
+    tiebreak = count()
+    expecting = {}     # br_name → {id(row): row} of open windows expecting it
+    unexplained = []   # executions in open windows none of them expects, in time order
+
+    def close(entry):
+        row = entry[3]
+        row["extra"] = unexplained[entry[2]:]
+        for name in row["expected"]:
+            del expecting[name][id(row)]
+
+    for ts, pos in zip(time_index.ts, time_index.positions):
+        second = int(ts)
+        while upcoming is not None and upcoming[0] <= second:
+            first, last, row = upcoming
+            if last >= second:
+                for name in row["expected"]:
+                    expecting.setdefault(name, {})[id(row)] = row
+                heapq.heappush(closing, (last, next(tiebreak), len(unexplained), row))
+            upcoming = next(pending, None)
+        while closing and closing[0][0] < second:
+            close(heapq.heappop(closing))
+
+        if not closing:
+            continue
+        execution = br_calls[pos]
+        owners = expecting.get(execution["br_name"])
+        if owners:
+            for row in owners.values():
+                row["matched"].append(execution)
+        else:
+            unexplained.append(execution)
+
+    for entry in closing:
+        close(entry)
+
+    result = []
+    for _, _, row in rows:
+        matched = row["matched"]
+        row["missing"] = (
+            row["expected"].difference([e["br_name"] for e in matched])
+            if matched else row["expected"]
+        )
+        result.append(row)
+    return result
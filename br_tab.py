@@ -1,12 +1,58 @@
 ﻿# br_tab.py
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QHBoxLayout, QPushButton, QLabel
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QAbstractItemView, QHeaderView
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QBrush, QColor
 from datetime import datetime
-import json
 import re
 
-PAGE_SIZE = 200
+from log_parser import BRTimeIndex, br_request, finish_br_execution
+from model import BRExecutionModel
+
+# Width of the expand arrow at the start of a row, in pixels
+ARROW_HIT_WIDTH = 16
+
+
+class BRTreeView(QTableView):
+    """Table view of a BRExecutionModel that expands and collapses like a tree.
+
+    A QTreeView lays out every top-level row when the model resets; a
+    table view asks only for the rows on screen.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.horizontalHeader().setDefaultAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        self.doubleClicked.connect(lambda index: self.toggle(index.row()))
+
+    def toggle(self, row):
+        model = self.model()
+        model.set_expanded(row, not model.is_expanded(row))
+
+    def mousePressEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        super().mousePressEvent(event)
+        if index.isValid() and event.button() == Qt.LeftButton:
+            text = index.data(Qt.DisplayRole) or ""
+            indent = self.fontMetrics().horizontalAdvance(text[:len(text) - len(text.lstrip())])
+            x = event.position().x() - self.visualRect(index).x() - indent
+            if 0 <= x < ARROW_HIT_WIDTH:
+                self.toggle(index.row())
+
+    def keyPressEvent(self, event):
+        index = self.currentIndex()
+        if index.isValid() and event.key() in (Qt.Key_Right, Qt.Key_Left):
+            self.model().set_expanded(index.row(), event.key() == Qt.Key_Right)
+            return
+        super().keyPressEvent(event)
+
 
 class BRTab(QWidget):
    
@@ -16,37 +62,14 @@ class BRTab(QWidget):
 
         layout = QVBoxLayout(self)
 
-        # Pagination controls
-        nav_layout = QHBoxLayout()
-        self.prev_btn = QPushButton("← Previous")
-        self.next_btn = QPushButton("Next →")
-        self.page_label = QLabel("Page 1 of 1")
-        
-        self.prev_btn.clicked.connect(self._prev_page)
-        self.next_btn.clicked.connect(self._next_page)
-        
-        nav_layout.addWidget(self.prev_btn)
-        nav_layout.addStretch()
-        nav_layout.addWidget(self.page_label)
-        nav_layout.addStretch()
-        nav_layout.addWidget(self.next_btn)
-        
-        layout.addLayout(nav_layout)
-
-        # Tree
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Business Rules"])
-
-        self.tree.setSortingEnabled(True)
-        self.tree.sortByColumn(0, Qt.AscendingOrder)
-        self.tree.setSortingEnabled(False)
-
-        self.tree.itemExpanded.connect(self.on_item_expanded)
-        self.tree.itemClicked.connect(self.on_br_clicked)
+        # Every displayed execution; rows are read as they scroll into view
+        self.model = BRExecutionModel()
+        self.tree = BRTreeView()
+        self.tree.setModel(self.model)
+        self.tree.clicked.connect(self.on_br_clicked)
         layout.addWidget(self.tree)
 
-        # Pagination state
-        self._current_page = 0
+        # Executions handed to the model
         self._all_executions = []
 
         # Full dataset (never overwritten)
@@ -58,100 +81,37 @@ class BRTab(QWidget):
         self.br_index = {}
         self.txn_map = {}
         self.br_name_index = {}
-        self.execution_item_map = {}
-        self.sorted_exec_times = []
-        self.sorted_executions = []
+        self.time_index = BRTimeIndex()  # br_calls in time order
 
-        self.execution_by_second = {}
-        self.highlighted_item = None
-        self.last_displayed_ids = None
-
-    def _prev_page(self):
-        if self._current_page > 0:
-            self._current_page -= 1
-            self._render_page()
-
-    def _next_page(self):
-        if not self._all_executions:
-            return
-        max_page = (len(self._all_executions) - 1) // PAGE_SIZE
-        if self._current_page < max_page:
-            self._current_page += 1
-            self._render_page()
-
-    def _render_page(self):
-        """Render only the current page of executions."""
-        start = self._current_page * PAGE_SIZE
-        end = start + PAGE_SIZE
-        chunk = self._all_executions[start:end]
-    
-        total = len(self._all_executions)
-        max_page = (total - 1) // PAGE_SIZE if total > 0 else 0
-    
-        # Update nav controls
-        self.prev_btn.setEnabled(self._current_page > 0)
-        self.next_btn.setEnabled(total > 0 and self._current_page < max_page)
-        self.page_label.setText(
-            f"Page {self._current_page + 1} of {max_page + 1}  "
-            f"(showing {start + 1}–{min(end, total)} of {total:,})"
-            if total > 0 else "No results"
-        )
-
-        # Render chunk
-        self.tree.setUpdatesEnabled(False)
-        self.tree.setSortingEnabled(False)
-        self.tree.clear()
-        self.execution_item_map.clear()
-
-        items = []
-        for execution in chunk:  # ← ADD reversed() HERE
-            ts = execution["timestamp"]
-            root_text = f"{ts.strftime('%H:%M:%S.%f')[:-3]}  {execution['br_name']}"
-
-            root_item = QTreeWidgetItem([root_text])
-            root_item.setData(0, Qt.UserRole, execution)
-
-            # 🔴 Always flag exception BR rule with full red row
-            if execution.get("br_name") == "BR_SYS_REG_BIZRULE_EXCEPTION":
-                root_item.setBackground(0, QBrush(QColor("red")))
-                root_item.setForeground(0, QBrush(QColor("white")))
-
-            self.execution_item_map[id(execution)] = root_item
-            root_item.addChild(QTreeWidgetItem(["Loading..."]))
-            items.append(root_item)
-
-            self.tree.addTopLevelItems(items)
-            self.tree.setSortingEnabled(True)
-            self.tree.sortByColumn(0, Qt.AscendingOrder)
-            self.tree.setUpdatesEnabled(True)
+        # Follow mode: merge state of the loaded BR log
+        self.br_log_path = None
+        self.parse_state = None
+        self._br_tail_worker = None
+        self._pending_tail = None  # (state, result, end) held back by a search
+        self.following = False  # set by the main window's follow mode
 
     def load_full_logs(self, filepath):
         self.full_br_logs = []
         self.full_br_index = {}
         self.br_calls = []
         self.br_name_index.clear()
-        self.tree.clear()
-        QTreeWidgetItem(self.tree, ["⏳ Parsing BR log…"])
+        self.show_message("⏳ Parsing BR log…")
 
         from worker import BRLogWorker
-        self._br_worker = BRLogWorker(filepath)
+        self.br_log_path = filepath
+        self.parse_state = None
+        self._br_worker = BRLogWorker(filepath, complete_lines=self.following)
         self._br_worker.finished.connect(self._on_br_calls_ready)
         self._br_worker.start()
 
     def _on_br_calls_ready(self, br_calls, full_br_index):  # ← Added full_br_index parameter
         self.br_calls = br_calls
         self.full_br_index = full_br_index  # ← Receive from worker
+        self.parse_state = self._br_worker.state
+        self.time_index = self.parse_state.time_index
         self.br_name_index.clear()
 
-        for execution in br_calls:
-            ts_val = execution.get("ts_val")
-            if ts_val is None:
-                continue
-            self.sorted_exec_times.append(ts_val)
-            self.sorted_executions.append(execution)
-            self.br_name_index.setdefault(execution["br_name"], []).append(execution)
-
-        self.build_execution_index()
+        self._index_executions(br_calls)
         self.populate_tree_from_executions(self.br_calls)
 
         main = self.window()
@@ -159,11 +119,62 @@ class BRTab(QWidget):
             main.build_br_list()
         main.br_logs_loading_finished = True
 
-    def build_execution_index(self):
-        self.execution_by_second.clear()
-        for execution in self.br_calls:
-            sec = int(execution["ts_val"])
-            self.execution_by_second.setdefault(sec, []).append(execution)
+    def _index_executions(self, executions):
+        for execution in executions:
+            self.br_name_index.setdefault(execution["br_name"], []).append(execution)
+
+    def _search_running(self):
+        main = self.window()
+        return hasattr(main, "search_running") and main.search_running()
+
+    def poll_appended_logs(self):
+        pending, self._pending_tail = self._pending_tail, None
+        if pending is not None and pending[0] is self.parse_state:
+            self._merge_tail(*pending[1:])
+
+        worker = self._br_tail_worker
+        if self.parse_state is None or (worker and worker.isRunning()):
+            return
+
+        from worker import BRTailWorker
+        self._br_tail_worker = BRTailWorker(self.br_log_path, self.parse_state)
+        self._br_tail_worker.finished.connect(self._on_br_tail_ready)
+        self._br_tail_worker.start()
+
+    def _on_br_tail_ready(self, result, end):
+        state = self.parse_state
+        if end is None or state is None or self._br_tail_worker.state is not state:
+            return
+
+        if self._search_running():
+            # A search is reading br_calls: merged by the next poll
+            self._pending_tail = (state, result, end)
+            return
+        self._merge_tail(result, end)
+
+    def _merge_tail(self, result, end):
+        state = self.parse_state
+        if end < state.offset:
+            # File was truncated or replaced: parse it again
+            self.load_full_logs(self.br_log_path)
+            return
+
+        added = state.append(result, end)
+        if added:
+            self.append_executions(added)
+
+    def append_executions(self, executions):
+        """Add executions completed by lines appended to the BR log."""
+        showing_all = self._all_executions is self.br_calls
+
+        # The parse state's time index already covers them
+        self.br_calls.extend(executions)
+        self.full_br_index = self.parse_state.full_br_index
+        self._index_executions(executions)
+
+        # New rows usually come after the shown ones
+        if showing_all:
+            self.model.grow(min(e["ts_val"] for e in executions))
 
     def build_full_index(self, logs):
         self.full_br_index.clear()
@@ -171,8 +182,9 @@ class BRTab(QWidget):
             raw = log.raw
             if "BIZRULE" in raw:
                 ts = self.extract_timestamp(raw)
+                ts_val = ts.timestamp() if ts != datetime.min else 0.0
                 name = raw.split("BIZRULE]")[-1].strip()
-                self.full_br_index.setdefault(name, []).append((ts, log))
+                self.full_br_index.setdefault(name, []).append((ts_val, log))
 
     def display_logs(self, logs):
         self.br_calls.clear()
@@ -182,8 +194,7 @@ class BRTab(QWidget):
 
     def show_all_brs(self):
         if not self.br_calls:
-            self.tree.clear()
-            QTreeWidgetItem(self.tree, ["⚠ No BR log loaded"])
+            self.show_message("⚠ No BR log loaded")
             return
         self.populate_tree_from_executions(self.br_calls)
 
@@ -202,6 +213,7 @@ class BRTab(QWidget):
 
             if "(REQUESTQ)" in raw:
                 ts = self.extract_timestamp(raw)
+                ts_val = ts.timestamp() if ts != datetime.min else 0.0
                 match = uuid_re.search(raw)
                 if not match:
                     i += 1
@@ -218,29 +230,7 @@ class BRTab(QWidget):
                         break
                     i += 1
 
-                try:
-                    request_json = json.loads("\n".join(block_lines))
-                except Exception:
-                    pending[uuid] = {"timestamp": ts, "br_name": "UNKNOWN", "tables": {}}
-                    i += 1
-                    continue
-
-                br_name = request_json.get("actID", "UNKNOWN")
-                tables = {}
-                ref_json = request_json.get("refDS")
-
-                if ref_json:
-                    try:
-                        ref_data = json.loads(ref_json)
-                        for table_name, rows in ref_data.items():
-                            tables[table_name] = [
-                                {k: "" if v is None else str(v) for k, v in row.items()}
-                                for row in rows
-                            ]
-                    except Exception:
-                        pass
-
-                pending[uuid] = {"timestamp": ts, "br_name": br_name, "tables": tables}
+                pending[uuid] = br_request(ts, ts_val, "\n".join(block_lines))
 
             elif "(RECEIVE_REPLYQ)" in raw:
                 match = uuid_re.search(raw)
@@ -255,65 +245,48 @@ class BRTab(QWidget):
                     continue
 
                 json_start = raw.find("{")
-                if json_start == -1:
-                    i += 1
-                    continue
-
-                try:
-                    reply_json = json.loads(raw[json_start:])
-                except Exception:
+                if json_start == -1 or not raw.rstrip().endswith("}"):
                     i += 1
                     continue
 
                 pending.pop(uuid, None)
-
-                for key, value in reply_json.items():
-                    if not key.startswith("OUT_"):
-                        continue
-                    execution["tables"][key] = [
-                        {k: "" if v is None else str(v) for k, v in row.items()}
-                        for row in value
-                    ]
-
-                execution["search_blob"] = (
-                    execution["br_name"] + " " + json.dumps(execution["tables"])
-                ).casefold()
+                finish_br_execution(execution, raw[json_start:].rstrip())
 
                 self.br_calls.append(execution)
                 self.br_name_index.setdefault(execution["br_name"], []).append(execution)
 
             i += 1
 
+        self.time_index = BRTimeIndex(self.br_calls)
+
     def populate_tree_from_executions(self, executions):
-        """Main entry point — store executions and render first page."""
-        ids = [id(e) for e in executions]
-        if ids == self.last_displayed_ids:
+        """Main entry point — show executions in time order."""
+        if executions is self._all_executions and len(executions) == self.model.count:
             return
-        self.last_displayed_ids = ids
 
         self._all_executions = executions
-        self._current_page = 0
-        self._render_page()
+        self.model.set_executions(
+            executions, self.time_index if executions is self.br_calls else None
+        )
 
-    def on_item_expanded(self, item):
-        execution = item.data(0, Qt.UserRole)
-        if not execution or item.childCount() > 1:
-            return
+    def show_message(self, *lines):
+        """Show lines of text instead of executions."""
+        self._all_executions = []
+        self.model.set_messages(lines)
 
-        item.takeChildren()
-        tables = execution["tables"]
+    def clear_view(self):
+        self.show_message()
 
-        for table_name, rows in tables.items():
-            table_item = QTreeWidgetItem([table_name])
-            item.addChild(table_item)
-            for row in rows:
-                for col, val in row.items():
-                    table_item.addChild(QTreeWidgetItem([f"{col}: {val}"]))
+    def reset(self):
+        """Forget the loaded BR log."""
+        self.clear_view()
+        self.br_calls = []
+        self.br_name_index = {}
+        self.time_index = BRTimeIndex()
+        self.parse_state = None
 
     def show_expected_brs(self, expected_brs):
-        self.tree.clear()
-        for br in sorted(expected_brs):
-            QTreeWidgetItem(self.tree, [f"{br} (Expected – Not Found)"])
+        self.show_message(*(f"{br} (Expected – Not Found)" for br in sorted(expected_brs)))
 
     def extract_timestamp(self, raw):
         try:
@@ -324,20 +297,34 @@ class BRTab(QWidget):
 
     def show_brs_in_timerange(self, start_ts, end_ts, expected_brs=None):
         if not self.br_calls:
-            self.tree.clear()
+            self.clear_view()
             return
 
-        filtered = [
-            e for e in self.br_calls
-            if start_ts <= e["ts_val"] <= end_ts
-            and (not expected_brs or e["br_name"] in expected_brs)
-        ]
+        filtered = self.executions_between(start_ts, end_ts, expected_brs or None)
 
         if filtered:
             self.populate_tree_from_executions(filtered)
         elif expected_brs:
             self.show_expected_brs(expected_brs)
 
+    def executions_between(self, start_ts, end_ts, br_names=None):
+        """Executions with start_ts <= ts_val <= end_ts, in time order.
+
+        br_names, if given, limits them to those rule names.
+        """
+        positions = self.time_index.window(start_ts, end_ts, br_names)
+        return [self.br_calls[pos] for pos in positions]
+
+    def executions_in_seconds(self, start_ts, end_ts, br_names=None):
+        """Executions whose whole second int(ts_val) is within [start_ts, end_ts], in time order.
+
+        br_names, if given, limits them to those rule names.
+        """
+        return [
+            e for e in self.executions_between(start_ts - 1, end_ts + 1, br_names)
+            if start_ts <= int(e["ts_val"]) <= end_ts
+        ]
+
     def search_brs(self, keyword, start_ts=None, end_ts=None):
         if not keyword:
             return None
@@ -345,16 +332,26 @@ class BRTab(QWidget):
         keyword = keyword.casefold()
         results = []
 
-        if start_ts and end_ts:
-            # Fixed: iterate dict items, not range
-            for sec, executions in self.execution_by_second.items():
-                if not (start_ts <= sec <= end_ts):
+        candidates = self._blob_candidates([keyword], [])
+        if candidates is not None:
+            if start_ts and end_ts:
+                candidates = self._candidates_between(candidates, start_ts - 1, end_ts + 1)
+            for pos in candidates:
+                execution = self.br_calls[pos]
+                if start_ts and end_ts and not (start_ts <= int(execution["ts_val"]) <= end_ts):
                     continue
-                for execution in executions:
-                    if keyword in execution.get("search_blob", ""):
-                        results.append(execution)
-                        if len(results) >= 500:  # cap results
-                            return results
+                if keyword in execution.get("search_blob", ""):
+                    results.append(execution)
+                    if len(results) >= 500:
+                        break
+            return results
+
+        if start_ts and end_ts:
+            for execution in self.executions_in_seconds(start_ts, end_ts):
+                if keyword in execution.get("search_blob", ""):
+                    results.append(execution)
+                    if len(results) >= 500:  # cap results
+                        return results
         else:
             for execution in self.br_calls:
                 if keyword in execution.get("search_blob", ""):
@@ -366,10 +363,16 @@ class BRTab(QWidget):
 
     def search_brs_multi(self, and_terms, or_terms, start_ts, end_ts):
         results = []
-        for execution in self.br_calls:
-            ts = execution["ts_val"]
-            if not (start_ts <= ts <= end_ts):
-                continue
+        candidates = self._blob_candidates(and_terms, or_terms)
+        if candidates is None:
+            executions = self.executions_between(start_ts, end_ts)
+        else:
+            executions = [
+                self.br_calls[pos]
+                for pos in self._candidates_between(candidates, start_ts, end_ts)
+            ]
+
+        for execution in executions:
             blob = execution.get("search_blob", "")
 
             if and_terms and not all(t in blob for t in and_terms):
@@ -380,48 +383,73 @@ class BRTab(QWidget):
             results.append(execution)
         return results
 
-    def highlight_br_executions(self, executions):
-        if not executions:
-            return
+    def _candidates_between(self, candidates, start_ts, end_ts):
+        """Candidate positions with start_ts <= ts_val <= end_ts, in time order."""
+        window = self.time_index.window(start_ts, end_ts)
+        if len(candidates) < len(window):
+            # Equal times keep br_calls order, as in the time index
+            timed = sorted((self.br_calls[pos]["ts_val"], pos) for pos in candidates)
+            return [pos for ts, pos in timed if start_ts <= ts <= end_ts]
+        keep = set(candidates)
+        return [pos for pos in window if pos in keep]
+
+    def _blob_candidates(self, and_terms, or_terms):
+        """Positions in br_calls that may match, from the parser's trigram index.
+
+        The index is built here on the first search with a term long
+        enough to use it, if the parse allowed that. Returns None when
+        there is no index or no term is long enough to narrow the search;
+        every execution must then be checked.
+        """
+        state = self.parse_state
+        # Positions only line up while br_calls mirrors the parsed list
+        if state is None or len(state.br_calls) != len(self.br_calls):
+            return None
+        if state.blob_trigrams is None and state.index_on_demand and any(
+            len(term) >= 3 for term in (*and_terms, *or_terms)
+        ):
+            state.index_blobs()
+        index = state.blob_trigrams
+        if index is None:
+            return None
 
-        # Find which page contains the first target
-        try:
-            idx = self._all_executions.index(executions[0])
-            target_page = idx // PAGE_SIZE
-        except (ValueError, IndexError):
-            target_page = self._current_page
+        found = None
+        for term in and_terms:
+            ids = index.candidates(term)
+            if ids is None:
+                continue
+            keep = set(ids)
+            found = ids if found is None else [i for i in found if i in keep]
 
-        if target_page != self._current_page:
-            self._current_page = target_page
-            self._render_page()
+        if found is None and or_terms:
+            union = set()
+            for term in or_terms:
+                ids = index.candidates(term)
+                if ids is None:
+                    return None
+                union.update(ids)
+            found = sorted(union)
 
-        self.clear_highlight()
-        self.highlighted_item = []
+        return found
 
-        for e in executions:
-            item = self.execution_item_map.get(id(e))
-            if item:
-                item.setBackground(0, QBrush(Qt.yellow))
-                self.highlighted_item.append(item)
+    def highlight_br_executions(self, executions):
+        if not executions:
+            return
 
-        if self.highlighted_item:
-            self.tree.scrollToItem(self.highlighted_item[0], QTreeWidget.PositionAtCenter)
+        self.model.set_highlighted(executions)
+        rows = [row for row in map(self.model.row_of, executions) if row is not None]
+        if rows:
+            self._scroll_to_row(min(rows))
 
     def clear_highlight(self):
-        if not self.highlighted_item:
-            return
-
-        items = self.highlighted_item if isinstance(self.highlighted_item, list) else [self.highlighted_item]
-        for item in items:
-            try:
-                item.setBackground(0, QBrush())  # reset to default
-            except RuntimeError:
-                pass
+        self.model.set_highlighted(())
 
-        self.highlighted_item = None
+    def _scroll_to_row(self, row):
+        index = self.model.index(self.model.display_row(row), 0)
+        self.tree.scrollTo(index, QAbstractItemView.PositionAtCenter)
 
-    def on_br_clicked(self, item, column):
-        exec_data = item.data(0, Qt.UserRole)
+    def on_br_clicked(self, index):
+        exec_data = index.data(Qt.UserRole)
         if not exec_data:
             return
 
@@ -434,50 +462,11 @@ class BRTab(QWidget):
             main_window.pending_variable_jump = ts
 
     def jump_to_execution(self, execution):
-        """Navigate to the page containing this execution and scroll to it."""
-        target_ts = execution.get("ts_val")
-        target_br = execution.get("br_name")
-    
-        if target_ts is None or target_br is None:
-            return
-    
-        # Binary search for the timestamp
-        import bisect
-        idx = bisect.bisect_left(self.sorted_exec_times, target_ts)
-    
-        # Scan nearby for matching br_name (handles duplicate timestamps)
-        target_idx = None
-        for i in range(max(0, idx - 10), min(len(self.sorted_executions), idx + 10)):
-            e = self.sorted_executions[i]
-            if e.get("ts_val") == target_ts and e.get("br_name") == target_br:
-                target_idx = i
-                break
-    
-        if target_idx is None:
-            return
-    
-        # Map from sorted_executions back to _all_executions
-        # (they should be the same if both came from br_calls)
-        target_execution = self.sorted_executions[target_idx]
-    
-        try:
-            page_idx = self._all_executions.index(target_execution)
-            target_page = page_idx // PAGE_SIZE
-        except ValueError:
-            # Fallback: scan _all_executions
-            for i, e in enumerate(self._all_executions):
-                if e.get("ts_val") == target_ts and e.get("br_name") == target_br:
-                    target_page = i // PAGE_SIZE
-                    target_execution = e
-                    break
-            else:
+        """Scroll to this execution's row."""
+        row = self.model.row_of(execution)
+        if row is None:
+            # Fall back to a displayed execution of the same rule and time
+            row = self.model.row_like(execution)
+            if row is None:
                 return
-    
-        if target_page != self._current_page:
-            self._current_page = target_page
-            self._render_page()
-    
-        item = self.execution_item_map.get(id(target_execution))
-        if item:
-            self.tree.scrollToItem(item, QTreeWidget.PositionAtCenter)
-            self.tree.setCurrentItem(item)
\ No newline at end of file
+        self._scroll_to_row(row)
\ No newline at end of file
@@ -1186,6 +1186,18 @@ class DBManager:
         """, (item_code,))
         return [row["br_code"] for row in cursor.fetchall()]
 
+    def get_item_brs(self):
+        """item_code → set of its br_codes, for every item with BRs."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT item_code, br_code
+            FROM item_brs
+        """)
+        item_brs = {}
+        for row in cursor.fetchall():
+            item_brs.setdefault(row["item_code"], set()).add(row["br_code"])
+        return item_brs
+
     def get_item_category(self, item_code):
         cursor = self.conn.cursor()
         cursor.execute("""
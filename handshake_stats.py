@@ -0,0 +1,203 @@
+# handshake_stats.py
+"""
+Latency statistics of completed B handshakes.
+
+The sequence builder records the time of each handshake step (STEPS) in
+a HandshakeTimings, one array per step and item. Alongside, every span in
+SPANS keeps a Counter of its durations per item, updated as handshakes
+are added, so percentiles are exact and summarizing only sorts distinct
+durations. Log timestamps have whole-second resolution, which keeps
+those few.
+
+timed_out() picks the handshakes that exceeded their item's timeout
+(timeout_for) from the same arrays. Per-item timeouts are user settings,
+read by load_timeouts() and changed by set_timeout().
+"""
+import json
+import math
+import operator
+import os
+from array import array
+from collections import Counter
+
+STEPS = ("B ON", "CONF ON", "B OFF", "CONF OFF")
+
+# Spans offered by the latency view: label → (from step, to step)
+SPANS = {
+    "B ON → CONF OFF": (0, 3),
+    "B ON → CONF ON": (0, 1),
+    "CONF ON → B OFF": (1, 2),
+    "B OFF → CONF OFF": (2, 3),
+}
+
+PERCENTILES = (50, 95, 99)
+
+# Seconds a B handshake may take from B ON to CONF OFF before it counts
+# as timed out, or as stuck while still open
+HANDSHAKE_TIMEOUT_SEC = 30
+
+# Per-item overrides of HANDSHAKE_TIMEOUT_SEC, by item code
+ITEM_TIMEOUTS = {}
+
+# Where the overrides are kept, as {"item code": seconds}
+TIMEOUTS_FILE = os.path.join(os.path.expanduser("~"), ".eif_log_viewer", "handshake_timeouts.json")
+
+
+def timeout_for(item):
+    return ITEM_TIMEOUTS.get(item, HANDSHAKE_TIMEOUT_SEC)
+
+
+def load_timeouts():
+    """Replace ITEM_TIMEOUTS with the overrides saved in TIMEOUTS_FILE.
+
+    A missing or unreadable file leaves no overrides; entries that are
+    not a positive number of seconds are skipped.
+    """
+    try:
+        with open(TIMEOUTS_FILE, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+
+    ITEM_TIMEOUTS.clear()
+    if isinstance(saved, dict):
+        ITEM_TIMEOUTS.update(
+            (item, seconds) for item, seconds in saved.items()
+            if type(seconds) in (int, float) and seconds > 0
+        )
+
+
+def set_timeout(item, seconds):
+    """Override an item's timeout and save the overrides.
+
+    seconds equal to HANDSHAKE_TIMEOUT_SEC (or None) removes the override.
+    """
+    if seconds is None or seconds == HANDSHAKE_TIMEOUT_SEC:
+        ITEM_TIMEOUTS.pop(item, None)
+    else:
+        ITEM_TIMEOUTS[item] = seconds
+
+    try:
+        os.makedirs(os.path.dirname(TIMEOUTS_FILE), exist_ok=True)
+        tmp = f"{TIMEOUTS_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ITEM_TIMEOUTS, f, indent=2, sort_keys=True)
+        os.replace(tmp, TIMEOUTS_FILE)
+    except OSError as e:
+        print(f"⚠ Could not save handshake timeouts: {e}")
+
+
+class HandshakeTimings:
+    """Step times (epoch seconds) of completed B handshakes, per item."""
+
+    def __init__(self):
+        self.times = {}      # item → one array("d") per step of STEPS
+        self.sequences = {}  # item → the matching B sequence dicts
+        self.counts = {}     # item → {span: Counter of durations}
+
+    def __len__(self):
+        return sum(map(len, self.sequences.values()))
+
+    def add(self, item, step_times, seq):
+        columns = self.times.get(item)
+        if columns is None:
+            columns = self.times[item] = tuple(array("d") for _ in STEPS)
+            self.sequences[item] = []
+            self.counts[item] = {span: Counter() for span in SPANS.values()}
+        for column, ts in zip(columns, step_times):
+            column.append(ts)
+        self.sequences[item].append(seq)
+        for (first, last), counts in self.counts[item].items():
+            counts[step_times[last] - step_times[first]] += 1
+
+    def latencies(self, item, span):
+        """Seconds between the span's two steps, in the order of sequences[item]."""
+        first, last = span
+        columns = self.times[item]
+        return array("d", map(operator.sub, columns[last], columns[first]))
+
+    def longest(self, item, span, keep=None):
+        """The item's sequence with the longest duration over span, or None.
+
+        keep, if given, limits the choice to durations it returns True for.
+        """
+        durations = self.latencies(item, span)
+        if keep is not None:
+            candidates = [i for i, d in enumerate(durations) if keep(d)]
+        else:
+            candidates = range(len(durations))
+        best = max(candidates, key=durations.__getitem__, default=None)
+        return None if best is None else self.sequences[item][best]
+
+
+def timed_out(timings, timeout_for=timeout_for):
+    """item → completed B sequences that took longer than timeout_for(item) seconds."""
+    found = {}
+    for item, columns in timings.times.items():
+        limit = timeout_for(item)
+        durations = map(operator.sub, columns[-1], columns[0])
+        slow = [i for i, d in enumerate(durations) if d > limit]
+        if slow:
+            seqs = timings.sequences[item]
+            found[item] = [seqs[i] for i in slow]
+    return found
+
+
+def summarize(counts):
+    """{"count", "p50", "p95", "p99", "max"} of a duration Counter, or None if empty.
+
+    Percentiles use the nearest-rank method: pN is the smallest duration
+    that at least N% of the durations do not exceed.
+    """
+    n = sum(counts.values())
+    if not n:
+        return None
+
+    ranks = iter([max(1, math.ceil(p * n / 100)) for p in PERCENTILES])
+    rank = next(ranks)
+    values = []
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        while rank is not None and seen >= rank:
+            values.append(value)
+            rank = next(ranks, None)
+        if rank is None:
+            break
+
+    summary = {"count": n, "max": max(counts)}
+    summary.update(zip((f"p{p}" for p in PERCENTILES), values))
+    return summary
+
+
+def latency_stats(timings, span):
+    """item → summarize() of its durations over span."""
+    return {item: summarize(spans[span]) for item, spans in timings.counts.items()}
+
+
+def _bin_layout(counts, bins):
+    """(low, width) of equal-width bins from the smallest to the largest duration."""
+    low, high = min(counts), max(counts)
+    return low, (high - low) / bins or 1.0
+
+
+def _bin(value, low, width, bins):
+    return min(int((value - low) / width), bins - 1)
+
+
+def histogram(counts, bins=20):
+    """[(low, high, count)] of a duration Counter over equal-width bins from min to max."""
+    if not counts:
+        return []
+
+    low, width = _bin_layout(counts, bins)
+    totals = [0] * bins
+    for value, count in counts.items():
+        totals[_bin(value, low, width, bins)] += count
+    return [(low + i * width, low + (i + 1) * width, total) for i, total in enumerate(totals)]
+
+
+def in_bin(counts, bins, index):
+    """Predicate for durations that histogram(counts, bins) puts in bin index."""
+    low, width = _bin_layout(counts, bins)
+    return lambda value: _bin(value, low, width, bins) == index
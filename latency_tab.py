@@ -0,0 +1,224 @@
+# latency_tab.py
+"""
+Handshake latency view: per-item percentiles of a B handshake span and a
+histogram of the selected item's durations.
+
+Clicking an item's Max cell, or a histogram bar, asks for the slowest
+sequence in it through sequence_requested. Double-clicking its Timeout
+cell edits the item's handshake timeout (see handshake_stats.set_timeout)
+and emits timeouts_changed.
+"""
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QTableWidget,
+    QTableWidgetItem, QAbstractItemView, QHeaderView, QInputDialog,
+)
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QPainter, QColor
+
+from handshake_stats import (
+    SPANS, PERCENTILES, latency_stats, histogram, in_bin, timeout_for, set_timeout,
+)
+
+HISTOGRAM_BINS = 20
+
+_COLUMNS = ["Item", "Count"] + [f"p{p}" for p in PERCENTILES] + ["Max", "Timeout"]
+_MAX_COLUMN = len(_COLUMNS) - 2
+_TIMEOUT_COLUMN = len(_COLUMNS) - 1
+
+# Largest timeout offered when editing, in seconds
+MAX_TIMEOUT_SEC = 24 * 60 * 60
+
+
+def _seconds(value):
+    return f"{value:g}s"
+
+
+class _NumberItem(QTableWidgetItem):
+    """Table cell that sorts by its number instead of its text."""
+
+    def __init__(self, value, text):
+        super().__init__(text)
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value < getattr(other, "value", 0)
+
+
+class LatencyHistogram(QWidget):
+    """Bar chart of (low, high, count) bins; bar_clicked gives the bin index."""
+    bar_clicked = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bins = []
+        self.setMinimumHeight(140)
+
+    def set_bins(self, bins):
+        self.bins = bins
+        self.update()
+
+    def _bar_width(self):
+        return self.width() / len(self.bins)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        if not self.bins:
+            return
+
+        tallest = max(count for _, _, count in self.bins) or 1
+        bar_width = self._bar_width()
+        label_height = painter.fontMetrics().height()
+        chart_height = self.height() - label_height
+
+        for i, (_, _, count) in enumerate(self.bins):
+            bar_height = int(chart_height * count / tallest)
+            painter.fillRect(
+                int(i * bar_width) + 1, chart_height - bar_height,
+                max(1, int(bar_width) - 2), bar_height, QColor("#4a90d9")
+            )
+
+        painter.drawText(0, self.height() - 2, _seconds(self.bins[0][0]))
+        high = _seconds(self.bins[-1][1])
+        painter.drawText(
+            self.width() - painter.fontMetrics().horizontalAdvance(high),
+            self.height() - 2, high
+        )
+
+    def mousePressEvent(self, event):
+        if self.bins:
+            index = int(event.position().x() // self._bar_width())
+            if 0 <= index < len(self.bins) and self.bins[index][2]:
+                self.bar_clicked.emit(index)
+        super().mousePressEvent(event)
+
+
+class LatencyTab(QWidget):
+    sequence_requested = Signal(str, object)   # item code, B sequence dict
+    timeouts_changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timings = None
+        self.item_name = None
+        self.current_item = None
+        self._stale = False
+
+        layout = QVBoxLayout(self)
+
+        span_layout = QHBoxLayout()
+        span_layout.addWidget(QLabel("Span"))
+        self.span_combo = QComboBox()
+        self.span_combo.addItems(list(SPANS))
+        self.span_combo.currentIndexChanged.connect(self.refresh)
+        span_layout.addWidget(self.span_combo, 1)
+        layout.addLayout(span_layout)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.cellClicked.connect(self.on_cell_clicked)
+        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        layout.addWidget(self.table, 1)
+
+        self.histogram_label = QLabel("")
+        layout.addWidget(self.histogram_label)
+        self.histogram = LatencyHistogram()
+        self.histogram.bar_clicked.connect(self.on_bar_clicked)
+        layout.addWidget(self.histogram)
+
+    def span(self):
+        return SPANS[self.span_combo.currentText()]
+
+    def set_timings(self, timings, item_name=None):
+        """Show a HandshakeTimings; item_name(code) gives display names."""
+        self.timings = timings
+        self.item_name = item_name
+        self.current_item = None
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the table; deferred until shown while the tab is hidden."""
+        if not self.isVisible():
+            self._stale = True
+            return
+        self._stale = False
+
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        if not self.timings:
+            self.histogram.set_bins([])
+            self.histogram_label.setText("")
+            return
+
+        stats = latency_stats(self.timings, self.span())
+        self.table.setRowCount(len(stats))
+        for row, (item, summary) in enumerate(stats.items()):
+            name = (self.item_name(item) if self.item_name else None) or item
+            cell = QTableWidgetItem(name)
+            cell.setData(Qt.UserRole, item)
+            self.table.setItem(row, 0, cell)
+            self.table.setItem(row, 1, _NumberItem(summary["count"], f"{summary['count']:,}"))
+            for column, key in enumerate(_COLUMNS[2:_TIMEOUT_COLUMN], start=2):
+                value = summary[key.lower()]
+                self.table.setItem(row, column, _NumberItem(value, _seconds(value)))
+            timeout = timeout_for(item)
+            self.table.setItem(row, _TIMEOUT_COLUMN, _NumberItem(timeout, _seconds(timeout)))
+
+        # Slowest items (by p99) first
+        self.table.setSortingEnabled(True)
+        self.table.sortItems(_MAX_COLUMN - 1, Qt.DescendingOrder)
+
+        if self.current_item in stats:
+            self.show_histogram(self.current_item)
+        elif self.table.rowCount():
+            self.show_histogram(self.table.item(0, 0).data(Qt.UserRole))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self.refresh()
+
+    def show_histogram(self, item):
+        self.current_item = item
+        counts = self.timings.counts[item][self.span()]
+        self.histogram.set_bins(histogram(counts, HISTOGRAM_BINS))
+        name = (self.item_name(item) if self.item_name else None) or item
+        self.histogram_label.setText(f"{name}: {self.span_combo.currentText()}")
+
+    def on_cell_clicked(self, row, column):
+        item = self.table.item(row, 0).data(Qt.UserRole)
+        self.show_histogram(item)
+        if column == _MAX_COLUMN:
+            self._request_longest(item)
+
+    def on_cell_double_clicked(self, row, column):
+        if column != _TIMEOUT_COLUMN:
+            return
+        item = self.table.item(row, 0).data(Qt.UserRole)
+        seconds, ok = QInputDialog.getInt(
+            self, "Handshake Timeout",
+            f"Seconds before a B handshake of {self.table.item(row, 0).text()} times out:",
+            int(timeout_for(item)), 1, MAX_TIMEOUT_SEC
+        )
+        if not ok or seconds == timeout_for(item):
+            return
+        set_timeout(item, seconds)
+        self.table.setItem(row, _TIMEOUT_COLUMN, _NumberItem(seconds, _seconds(seconds)))
+        self.timeouts_changed.emit()
+
+    def on_bar_clicked(self, index):
+        if self.current_item is None:
+            return
+        counts = self.timings.counts[self.current_item][self.span()]
+        self._request_longest(self.current_item, in_bin(counts, HISTOGRAM_BINS, index))
+
+    def _request_longest(self, item, keep=None):
+        seq = self.timings.longest(item, self.span(), keep)
+        if seq is not None:
+            self.sequence_requested.emit(item, seq)
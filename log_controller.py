@@ -7,12 +7,13 @@
 - 전체 상태 초기화
 """
 import re
+from array import array
 from datetime import datetime
 
 from PySide6.QtWidgets import QFileDialog, QListView, QMessageBox
 from PySide6.QtCore import QDateTime, QTimer
 
-from worker import VariableLogWorker
+from worker import SearchWorker, VariableLogWorker
 from db_manager import DBManager
 
 
@@ -45,6 +46,11 @@ class LogController:
         self._search_timer.setSingleShot(True)
         self._search_timer.timeout.connect(self.execute_search)
 
+        # 검색은 SearchWorker 에서 실행, 이전 세대의 결과는 버림
+        self.search_generation       = 0
+        self._search_worker          = None
+        self._retired_search_workers = []
+
     # =========================================================
     # 파일 열기
     # =========================================================
@@ -139,11 +145,11 @@ class LogController:
     # 기간
     # =========================================================
     def update_period_from_logs(self):
-        times = [log.ts for log in self.variable_logs if log.ts]
-        if not times:
+        span = self.variable_logs.time_range() if self.variable_logs else None
+        if not span:
             return
-        self.period_start = QDateTime(min(times))
-        self.period_end   = QDateTime(max(times))
+        self.period_start = QDateTime(span[0])
+        self.period_end   = QDateTime(span[1])
 
     # =========================================================
     # 검색
@@ -161,30 +167,74 @@ class LogController:
 
         left  = bisect.bisect_left(self.variable_timestamps, start_ts)
         right = bisect.bisect_right(self.variable_timestamps, end_ts)
-        subset = self.variable_logs[left:right]
 
-        result = [
-            log for log in subset
-            if not keyword_lower or keyword_lower in log.raw_lower
+        terms = [keyword_lower] if keyword_lower else []
+        if not self.variable_logs:
+            self.display_logs([])
+        elif not terms:
+            self.display_logs(self.variable_logs.subset(range(left, right)))
+        else:
+            # 결과는 _on_search_rows 가 배치 단위로 추가
+            self.cancel_search()
+            self.page.log_model.setLogs(self.variable_logs.subset(array("I")))
+            self.page.br_tab.clear_highlight()
+
+        br_tab    = self.page.br_tab
+        br_search = None
+        if br_tab.br_calls:
+            if keyword:
+                def search_brs():
+                    return br_tab.search_brs(keyword_lower, start_ts, end_ts)
+                br_search = search_brs
+            else:
+                br_tab.show_brs_in_timerange(start_ts, end_ts)
+
+        if terms and (self.variable_logs or br_search):
+            store  = self.variable_logs.store if self.variable_logs else None
+            worker = SearchWorker(self.search_generation, store, terms, [], left, right, br_search)
+            worker.rows_found.connect(self._on_search_rows)
+            worker.brs_found.connect(self._on_search_brs)
+            worker.failed.connect(self._on_search_failed)
+            self._search_worker = worker
+            worker.start()
+
+    def cancel_search(self):
+        """실행 중인 검색을 중단. 이후 도착하는 결과는 무시."""
+        self.search_generation += 1
+        worker = self._search_worker
+        self._search_worker = None
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+            # 스레드가 끝날 때까지 참조 유지
+            self._retired_search_workers.append(worker)
+        self._retired_search_workers = [
+            w for w in self._retired_search_workers if w.isRunning()
         ]
-        self.display_logs(result)
 
-        br_tab = self.page.br_tab
-        if not br_tab.br_calls:
+    def _on_search_rows(self, generation, rows):
+        if generation == self.search_generation:
+            self.page.log_model.appendRows(rows)
+
+    def _on_search_failed(self, generation, message):
+        if generation != self.search_generation:
             return
-        if not keyword:
-            br_tab.show_brs_in_timerange(start_ts, end_ts)
+        mw = self.page.window()
+        if hasattr(mw, "statusBar"):
+            mw.statusBar().showMessage(f"Search failed: {message}", 8000)
+
+    def _on_search_brs(self, generation, br_results):
+        if generation != self.search_generation:
             return
-        br_results = br_tab.search_brs(keyword_lower, start_ts, end_ts)
         if br_results:
-            br_tab.populate_tree_from_executions(br_results)
+            self.page.br_tab.populate_tree_from_executions(br_results)
         else:
-            br_tab.tree.clear()
+            self.page.br_tab.clear_view()
 
     # =========================================================
     # 로그 표시
     # =========================================================
     def display_logs(self, logs):
+        self.cancel_search()
         self.page.log_model.setLogs(logs or [])
         self.page.br_tab.clear_highlight()
 
@@ -233,25 +283,14 @@ class LogController:
         self.period_start = QDateTime.currentDateTime().addSecs(-3600)
         self.period_end   = QDateTime.currentDateTime()
 
+        self.cancel_search()
         self.page.log_model.setLogs([])
 
         self.page.search_input.blockSignals(True)
         self.page.search_input.clear()
         self.page.search_input.blockSignals(False)
 
-        br_tab = self.page.br_tab
-        br_tab.tree.clear()
-        br_tab.br_calls            = []
-        br_tab.br_name_index       = {}
-        br_tab.execution_item_map  = {}
-        br_tab.sorted_exec_times   = []
-        br_tab.sorted_executions   = []
-        br_tab.execution_by_second = {}
-        br_tab.highlighted_item    = None
-        br_tab.last_displayed_ids  = None
-        br_tab._all_executions     = []
-        br_tab._current_page       = 0
-        br_tab.page_label.setText("Page 1 of 1")
+        self.page.br_tab.reset()
 
         self.db.clear_all()
 
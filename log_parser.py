@@ -0,0 +1,1359 @@
+# log_parser.py
+"""
+Parsing core for variable and BR logs, free of Qt.
+
+Process-pool children import only this module and the Qt-free modules it
+imports, so a spawned child starts without loading PySide6. The
+QThread classes in worker.py are thin adapters over parse_variable_log,
+parse_br_log and the *_appended functions below.
+"""
+import re
+import json
+import codecs
+from datetime import datetime
+import bisect
+import heapq
+import os
+import threading
+from array import array
+from collections import deque
+from contextlib import closing
+from itertools import count
+from multiprocessing import shared_memory
+
+import parse_cache
+import process_pool
+from handshake_stats import HandshakeTimings, timed_out
+from log_store import LogStore, remap_rows
+from ngram_index import TrigramIndex
+
+# Logs larger than these are parsed in parallel chunks
+VARIABLE_PARALLEL_BYTES = 50 * 1024 * 1024
+BR_PARALLEL_BYTES = 20 * 1024 * 1024
+
+
+# ============================================================
+# HELPER FUNCTIONS (must be at module level for multiprocessing)
+# ============================================================
+
+KNOWN_EQUIPMENTS = ["MIX","COT","ROL","RWD","TRS","SLT","NND","LAM","STK","PKG","CESS"]
+
+def _detect_equipment(raw):
+    try:
+        for part in raw.split("["):
+            if "." in part and "]" in part:
+                prefix = part.split("]")[0].split(".")[0].upper()
+                for eq in KNOWN_EQUIPMENTS:
+                    if eq in prefix:
+                        return eq
+    except Exception:
+        pass
+    return None
+
+def _extract_item_code(raw):
+    try:
+        # Only look at the structural part, before the value
+        structural = raw.split(" : ")[0] if " : " in raw else raw
+        
+        parts = structural.split("[")
+        result = None
+        for part in parts:
+            if ":" in part and "]" in part:
+                block = part.split("]")[0]
+                candidate = block.split(":")[0]
+                # Skip system blocks (contain dots like "DNC1_1.IO_DNC")
+                if "." not in candidate:
+                    result = candidate
+        return result
+    except Exception:
+        pass
+    return None
+
+def _parse_item_signal(raw):
+    try:
+        structural = raw.split(" : ")[0] if " : " in raw else raw
+        block = structural.split("[")[-1].split("]")[0]
+        item, signal = block.split(":")
+        return item, signal
+    except:
+        return None, None
+
+def _parse_value(raw):
+    try:
+        if " : " in raw:
+            return raw.rsplit(" : ", 1)[1].strip()
+    except:
+        pass
+    return None
+
+# Epoch seconds at the start of each "YYYY-MM-DD HH" seen (None if invalid).
+# Minutes and seconds are added to it, so a datetime is built once per hour
+# of log rather than once per line.
+_hour_epochs = {}
+_HOUR_EPOCHS_MAX = 100_000
+
+def _hour_epoch(prefix):
+    epoch = _hour_epochs.get(prefix, False)
+    if epoch is False:
+        try:
+            epoch = datetime(
+                int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]), int(prefix[11:13])
+            ).timestamp()
+        except (ValueError, OverflowError, OSError):
+            epoch = None
+        if len(_hour_epochs) >= _HOUR_EPOCHS_MAX:
+            _hour_epochs.clear()
+        _hour_epochs[prefix] = epoch
+    return epoch
+
+def _line_epoch(raw):
+    """Epoch seconds of a line's leading "YYYY-MM-DD HH:MM:SS", or None if invalid."""
+    hour = _hour_epoch(raw[:13])
+    if hour is None:
+        return None
+    try:
+        minute = int(raw[14:16])
+        second = int(raw[17:19])
+    except ValueError:
+        return None
+    if not (0 <= minute < 60 and 0 <= second < 60):
+        return None
+    return hour + (minute * 60 + second)
+
+_BR_TIMESTAMP_RE = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.(\d{1,6})")
+
+def _br_timestamp(ts_str):
+    """(epoch seconds, datetime) of a "%Y-%m-%d %H:%M:%S.%f" BR timestamp.
+
+    Invalid timestamps give (0.0, datetime.min). Only odd layouts that
+    strptime still accepts (one-digit fields) go through strptime.
+    """
+    match = _BR_TIMESTAMP_RE.fullmatch(ts_str)
+    if match:
+        epoch = _line_epoch(ts_str)
+        if epoch is None:
+            return 0.0, datetime.min
+        micro = int(match.group(1).ljust(6, "0"))
+        return epoch + micro / 1e6, datetime(
+            int(ts_str[0:4]), int(ts_str[5:7]), int(ts_str[8:10]),
+            int(ts_str[11:13]), int(ts_str[14:16]), int(ts_str[17:19]), micro
+        )
+    try:
+        ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
+        return ts.timestamp(), ts
+    except (ValueError, OverflowError, OSError):
+        return 0.0, datetime.min
+
+def _br_epoch(ts_str):
+    """Epoch seconds of a BR timestamp without building a datetime; 0.0 if invalid."""
+    match = _BR_TIMESTAMP_RE.fullmatch(ts_str)
+    if match:
+        epoch = _line_epoch(ts_str)
+        if epoch is None:
+            return 0.0
+        return epoch + int(match.group(1).ljust(6, "0")) / 1e6
+    return _br_timestamp(ts_str)[0]
+
+def _decode_system_block(system_block):
+    """(system, category, equipment) named by a system block such as "A1EROL101.RollMapElm".
+
+    Matches the per-line helpers: equipment is looked for before the
+    first dot, and None when system_block is None.
+    """
+    if system_block is None:
+        return None, "EQP", None
+
+    system_upper = system_block.upper()
+    if "RMS" in system_upper:
+        category = "RMS"
+    elif "ROLLMAP" in system_upper:
+        category = "ROLLMAP"
+    else:
+        category = "EQP"
+
+    prefix = system_upper.split(".")[0]
+    equipment = next((eq for eq in KNOWN_EQUIPMENTS if eq in prefix), None)
+    return system_block.split(".")[-1], category, equipment
+
+# The usual line shape, "<timestamp> [<system.block>][<item>:<signal>] : <value>",
+# matched in one pass. Blocks exclude ":" so the first " : " is the value
+# separator, as the helpers above assume.
+_LINE_RE = re.compile(
+    r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d "
+    r"\[([^\[\]:.]*\.[^\[\]:]*)\]"
+    r"\[([^\[\]:]*):([^\[\]:]*)\]"
+    r"( : .*)?$"
+)
+
+def _tokenize_line(raw):
+    """(system_block, item_code, item, signal, value) of a line.
+
+    system_block is the first "[...]" block the system and equipment are
+    read from (see _decode_system_block). Gives exactly what the helpers
+    above give, from one regex match for lines of the usual shape; other
+    lines go through the helpers.
+    """
+    m = _LINE_RE.match(raw)
+    if m is None:
+        system_block = None
+        for p in raw.split("["):
+            if "." in p and "]" in p:
+                system_block = p.split("]")[0]
+                break
+        item, signal = _parse_item_signal(raw)
+        return system_block, _extract_item_code(raw), item, signal, _parse_value(raw)
+
+    system_block, item, signal, value = m.groups()
+    if value is not None:
+        # The value is what follows the last " : "
+        value = raw[raw.rfind(" : ") + 3:].strip()
+    return system_block, None if "." in item else item, item, signal, value
+
+# ============================================================
+# HANDSHAKE PATTERNS
+# ============================================================
+
+# Signal roles: the first fragment found in a signal name gives its role.
+# Lines whose signal has no role are not sequence events.
+HANDSHAKE_ROLES = (
+    ("W_TRIGGER_REPORT_ACK", "w_ack"),
+    ("W_TRIGGER", "w"),
+    ("B_TRIGGER_REPORT_CONF", "b_conf"),
+    ("B_TRIGGER_REPORT", "b"),
+)
+
+# (role, value) → (action, arg) pairs run in order; a None value covers
+# values without an entry of their own. Actions of _SequenceBuilder:
+#   ack    W acknowledgement error for the item
+#   w      W event, unless inside a B sequence or already seen
+#   open   start a handshake, dropping an unfinished one
+#   step   handshake step; arg is its bit in the handshake's steps mask
+#   close  end the handshake; it becomes a B sequence if the steps mask
+#          holds every bit in arg
+HANDSHAKE_TRANSITIONS = {
+    # W_TRIGGER_REPORT: one line per event; ACK 11 flags an error
+    ("w_ack", "11"): (("ack", None), ("w", None)),
+    ("w_ack", None): (("w", None),),
+    ("w", None): (("w", None),),
+    # B_TRIGGER_REPORT: B ON, CONF ON and B OFF (either order), CONF OFF
+    ("b", "ON"): (("open", None),),
+    ("b_conf", "ON"): (("step", 0b01),),
+    ("b", "OFF"): (("step", 0b10),),
+    ("b_conf", "OFF"): (("close", 0b11),),
+}
+
+class _SequenceBuilder:
+    """W/B sequence detection, fed one signal line at a time in file order.
+
+    Signal lines are dispatched through the HANDSHAKE_* tables above.
+
+    Events carry epoch seconds; datetimes are built only for the start and
+    end of the sequences handed to the tree.
+
+    Listed W sequences are also kept per item sorted by start (w_starts,
+    w_seqs), so a completed B finds the W events inside its window by
+    bisection. Evicted ones are only dropped from ``sequences`` when it is
+    next read, in one pass per item.
+
+    Completed B handshakes also record their step times in ``timings``.
+    Handshakes that end without completing are kept in ``dropped``; see
+    anomalies().
+    """
+
+    def __init__(self, buffer_sec=1):
+        self.buffer_sec = buffer_sec
+        self._sequences = {}
+        self.active = {}
+        self.b_intervals = {}
+        self.w_timestamps = {}
+        self.w_starts = {}
+        self.w_seqs = {}
+        self.ack_events = {}
+        self.timings = HandshakeTimings()
+        self.dropped = {}     # item → overwritten and incomplete handshakes
+        self.dropped_count = 0
+        self.last_ts = 0.0    # latest handshake signal time fed
+        self._evicted = {}  # item → ids of evicted W sequences still listed
+
+    @property
+    def sequences(self):
+        """item → W and B sequences in the order they were found."""
+        self._drop_evicted()
+        return self._sequences
+
+    def _drop_evicted(self):
+        for item, evicted in self._evicted.items():
+            seqs = self._sequences[item]
+            seqs[:] = [s for s in seqs if id(s) not in evicted]
+        self._evicted.clear()
+
+    def __getstate__(self):
+        # Evicted ids mean nothing once unpickled
+        self._drop_evicted()
+        return self.__dict__
+
+    def feed(self, item, signal, val, ts, line_idx):
+        transitions = _signal_transitions(signal)
+        if transitions is None:
+            return
+        if ts > self.last_ts:
+            self.last_ts = ts
+        for action, arg in transitions.get(val) or transitions.get(None, ()):
+            action(self, item, ts, line_idx, arg)
+
+    def _ack(self, item, ts, line_idx, arg):
+        self.ack_events.setdefault(item, []).append(ts)
+
+    def _w(self, item, ts, line_idx, arg):
+        buffer_sec = self.buffer_sec
+        lo = ts - buffer_sec
+        hi = ts + buffer_sec
+
+        intervals = self.b_intervals.get(item, [])
+        idx_bisect = bisect.bisect_left(intervals, (lo,))
+
+        for iv_start, iv_end in intervals[max(0, idx_bisect - 1): idx_bisect + 2]:
+            if iv_start <= hi and iv_end >= lo:
+                return
+
+        seen_w = self.w_timestamps.setdefault(item, set())
+        if ts in seen_w:
+            return
+        seen_w.add(ts)
+
+        ts_dt = datetime.fromtimestamp(ts)
+        w_seq = {
+            "start": ts_dt,
+            "end": ts_dt,
+            "type": "W"
+        }
+        self._sequences.setdefault(item, []).append(w_seq)
+
+        starts = self.w_starts.setdefault(item, [])
+        pos = bisect.bisect_right(starts, ts)
+        starts.insert(pos, ts)
+        self.w_seqs.setdefault(item, []).insert(pos, w_seq)
+
+    def _open(self, item, ts, line_idx, arg):
+        unfinished = self.active.get(item)
+        if unfinished is not None:
+            self._drop(item, unfinished, "overwritten", ts)
+        self.active[item] = {
+            "start": ts,
+            "steps": 0,
+            "step_ts": {},  # step bit → time it was first seen
+            "lines": [line_idx]
+        }
+
+    def _step(self, item, ts, line_idx, bit):
+        seq = self.active.get(item)
+        if seq is not None:
+            seq["steps"] |= bit
+            seq["step_ts"].setdefault(bit, ts)
+            seq["lines"].append(line_idx)
+
+    def _close(self, item, ts, line_idx, required_steps):
+        seq = self.active.pop(item, None)
+        if seq is None:
+            return
+        if seq["steps"] & required_steps != required_steps:
+            seq["lines"].append(line_idx)
+            self._drop(item, seq, "incomplete", ts)
+            return
+
+        buffer_sec = self.buffer_sec
+        seq["lines"].append(line_idx)
+        existing = self._sequences.setdefault(item, [])
+
+        # Evict W events inside this B window
+        starts = self.w_starts.get(item)
+        if starts:
+            lo_i = bisect.bisect_left(starts, seq["start"] - buffer_sec)
+            hi_i = bisect.bisect_right(starts, ts + buffer_sec)
+            if hi_i > lo_i:
+                w_seqs = self.w_seqs[item]
+                self._evicted.setdefault(item, set()).update(
+                    map(id, w_seqs[lo_i:hi_i])
+                )
+                del starts[lo_i:hi_i]
+                del w_seqs[lo_i:hi_i]
+
+        acks = self.ack_events.get(item, [])
+        lo_i = bisect.bisect_left(acks, seq["start"])
+        hi_i = bisect.bisect_right(acks, ts)
+        has_ack_error = hi_i > lo_i
+
+        b_seq = {
+            "start": datetime.fromtimestamp(seq["start"]),
+            "end": datetime.fromtimestamp(ts),
+            "type": "B",
+            "core_indices": seq["lines"],
+            "error": has_ack_error
+        }
+        existing.append(b_seq)
+
+        step_ts = seq["step_ts"]
+        self.timings.add(
+            item, (seq["start"], *(step_ts[bit] for bit in sorted(step_ts)), ts), b_seq
+        )
+
+        # Register interval for future W overlap checks
+        bisect.insort(self.b_intervals.setdefault(item, []), (seq["start"], ts))
+
+    def _drop(self, item, seq, kind, end):
+        self.dropped.setdefault(item, []).append(_anomaly(seq, kind, end))
+        self.dropped_count += 1
+
+    def anomalies(self, timeout_for):
+        """item → handshakes that went wrong, by start time.
+
+        Besides the overwritten ones (a new B ON before CONF OFF) and the
+        incomplete ones (CONF OFF without CONF ON and B OFF) found while
+        parsing, these are completed handshakes that took longer than
+        timeout_for(item) seconds ("timeout") and open ones older than
+        that at the latest signal ("stuck").
+        """
+        found = {item: list(seqs) for item, seqs in self.dropped.items()}
+        for item, seq in self.active.items():
+            if self.last_ts - seq["start"] > timeout_for(item):
+                found.setdefault(item, []).append(_anomaly(seq, "stuck", self.last_ts))
+        for item, seqs in timed_out(self.timings, timeout_for).items():
+            found.setdefault(item, []).extend(dict(seq, type="timeout") for seq in seqs)
+        for seqs in found.values():
+            seqs.sort(key=lambda s: s["start"])
+        return found
+
+def _anomaly(seq, kind, end):
+    """Sequence dict for an open handshake that ended (or was seen last) at end."""
+    return {
+        "start": datetime.fromtimestamp(seq["start"]),
+        "end": datetime.fromtimestamp(end),
+        "type": kind,
+        "core_indices": list(seq["lines"]),
+    }
+
+_HANDSHAKE_ACTIONS = {
+    "ack": _SequenceBuilder._ack,
+    "w": _SequenceBuilder._w,
+    "open": _SequenceBuilder._open,
+    "step": _SequenceBuilder._step,
+    "close": _SequenceBuilder._close,
+}
+
+def _compile_handshake(roles, transitions):
+    """role → {value: ((action function, arg), ...)} for _SequenceBuilder.feed."""
+    compiled = {role: {} for _, role in roles}
+    for (role, value), actions in transitions.items():
+        compiled[role][value] = tuple(
+            (_HANDSHAKE_ACTIONS[name], arg) for name, arg in actions
+        )
+    return compiled
+
+_HANDSHAKE = _compile_handshake(HANDSHAKE_ROLES, HANDSHAKE_TRANSITIONS)
+_signal_handshake = {}  # signal name → its role's transitions, or None
+
+def _signal_transitions(signal):
+    try:
+        return _signal_handshake[signal]
+    except KeyError:
+        role = next((role for fragment, role in HANDSHAKE_ROLES if fragment in signal), None)
+        transitions = _signal_handshake[signal] = _HANDSHAKE.get(role)
+        return transitions
+
+def _is_sequence_signal(signal):
+    return _signal_transitions(signal) is not None
+
+def _split_file_by_bytes(filepath, num_chunks, file_size=None):
+    """Split file into roughly equal byte ranges aligned to line starts.
+
+    Only the first file_size bytes are split, by default the whole file.
+    """
+    if file_size is None:
+        file_size = os.path.getsize(filepath)
+    bounds = [0]
+
+    with open(filepath, "rb") as f:
+        for i in range(1, num_chunks):
+            # Probe forward from the raw offset to the next line start
+            f.seek(file_size * i // num_chunks)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < file_size:
+                bounds.append(pos)
+
+    bounds.append(file_size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _iter_byte_lines(filepath, start, end):
+    """Yield (offset, raw_bytes) for each line of the byte range [start, end)."""
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        pos = start
+        for raw in f:
+            if pos >= end:
+                break
+            line_start = pos
+            pos += len(raw)
+            if line_start == 0 and raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+                line_start = len(codecs.BOM_UTF8)
+            yield line_start, raw
+
+def _iter_byte_range(filepath, start, end):
+    """Yield decoded lines of the byte range [start, end), one per line in the file."""
+    for _, raw in _iter_byte_lines(filepath, start, end):
+        yield raw.decode("utf-8", errors="ignore")
+
+def _process_variable_chunk(filepath, start, end, lazy_text=False, substring_index=False,
+                            text_block=None):
+    """Process a byte range of the variable log file into a LogStore.
+
+    Line numbers are chunk-local; the caller rebases them with the
+    returned line count. Handshake state can straddle chunk boundaries,
+    so instead of building sequences the chunk returns its W/ACK/B events
+    for the merge stage to replay through one _SequenceBuilder.
+    With lazy_text the store records file offsets instead of line text;
+    with substring_index it also builds a trigram index.
+
+    text_block names a shared memory block of at least end - start + 1
+    bytes; the store's text is written there instead of being pickled
+    back, and the returned store has none (see _attach_text).
+    """
+    store = LogStore(file_backed=lazy_text, trigrams=substring_index)
+    seq_events = []  # (item, signal, val, epoch ts, local_idx) for the merge stage
+    item_categories = {}  # Track categories during parsing
+    eqp_set = set()
+    blocks = {}  # system block → (block id, category, equipment)
+    skipped_count = 0
+    line_count = 0
+    
+    for idx, (offset, raw_bytes) in enumerate(_iter_byte_lines(filepath, start, end)):
+        line_count += 1
+        raw_bytes = raw_bytes.rstrip()
+        if not raw_bytes:
+            continue
+        raw = raw_bytes.decode("utf-8", errors="ignore")
+        
+        # Validation
+        if len(raw) < 19:
+            skipped_count += 1
+            continue
+        
+        ts_str = raw[:19]
+        if not (ts_str[4] == '-' and ts_str[7] == '-' and ts_str[10] == ' ' and ts_str[13] == ':' and ts_str[16] == ':'):
+            skipped_count += 1
+            continue
+        
+        if "[" not in raw or "]" not in raw:
+            skipped_count += 1
+            continue
+        
+        # Parse timestamp
+        ts = _line_epoch(raw)
+        ts_val = 0 if ts is None else ts
+
+        system_block, item_code, item, signal, value = _tokenize_line(raw)
+
+        # Each distinct system block is decoded once per chunk
+        block = blocks.get(system_block)
+        if block is None:
+            system, category, equipment = _decode_system_block(system_block)
+            block = blocks[system_block] = (
+                store.block_id(system, category), category, equipment
+            )
+        block_id, category, eqp = block
+        if eqp is None and system_block is not None:
+            # A later block may still name the equipment
+            eqp = _detect_equipment(raw)
+        if eqp:
+            eqp_set.add(eqp)
+        if item_code:
+            _note_category(item_categories, item_code, category)
+
+        store.append(ts_val, idx, raw_bytes, item_code, block_id, offset)
+        
+        # Sequence events are replayed in file order by the merge stage
+        if ts is None:
+            continue
+
+        if not item or not signal or not _is_sequence_signal(signal):
+            continue
+
+        seq_events.append((item, signal, value, ts, idx))
+
+    if text_block is not None:
+        block = shared_memory.SharedMemory(name=text_block)
+        try:
+            block.buf[:len(store.text)] = store.text
+        finally:
+            block.close()
+        store.text = None
+
+    return (store, seq_events, item_categories, eqp_set, skipped_count, line_count)
+
+
+def _note_category(categories, item_code, category):
+    """Record an item's category; the first non-EQP one seen wins over EQP.
+
+    Chunks and the merge of their results apply the same rule, so the
+    outcome does not depend on where the file was split.
+    """
+    if item_code not in categories:
+        categories[item_code] = category
+    elif categories[item_code] == "EQP" and category != "EQP":
+        # If we already have EQP but found RMS/ROLLMAP, upgrade it
+        categories[item_code] = category
+
+
+def _attach_text(store, block):
+    """Give a chunk store a zero-copy view of the text it wrote to block.
+
+    Each row's text is followed by a newline, so the last row's end
+    gives the size. Release the view before closing the block.
+    """
+    size = store.starts[-1] + store.lengths[-1] + 1 if len(store) else 0
+    store.text = block.buf[:size]
+
+
+def _free_block(block):
+    """Close and remove a chunk's text block; views on it must be released."""
+    if block is not None:
+        block.close()
+        block.unlink()
+
+
+_BR_UUID_RE = re.compile(r"(?:ELTR\w*|ASSY\w*)\((.*?)\)")
+_BR_TS_RE = re.compile(r"\d{4}-\d{2}-\d{2} ")
+
+_BR_ACT_ID_RE = re.compile(r'"actID"\s*:\s*"([^"\\]*)"')
+
+def _stringify_rows(rows):
+    return [
+        {k: "" if v is None else str(v) for k, v in row.items()}
+        for row in rows
+    ]
+
+def br_request(timestamp, ts_val, request):
+    """Pending execution of a REQUESTQ block, kept as its raw JSON text.
+
+    Only actID is read here; the tables are decoded by br_tables() when
+    someone looks at them.
+    """
+    match = _BR_ACT_ID_RE.search(request)
+    return {
+        "timestamp": timestamp,
+        "ts_val": ts_val,
+        "br_name": match.group(1) if match else "UNKNOWN",
+        "request": request,
+    }
+
+def finish_br_execution(execution, reply):
+    """Attach the raw JSON text of a reply to its pending request."""
+    execution["reply"] = reply
+    execution["search_blob"] = (
+        execution["br_name"] + " " + execution["request"] + " " + reply
+    ).casefold()
+
+def _json_object(text):
+    """text decoded as a JSON object, or {} if it is anything else."""
+    if isinstance(text, dict):
+        return text
+    try:
+        value = json.loads(text)
+    except (ValueError, TypeError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+def _add_table(tables, name, rows):
+    """Add a table whose value is a list of row objects; skip anything else."""
+    if isinstance(rows, list):
+        tables[name] = _stringify_rows(row for row in rows if isinstance(row, dict))
+
+def br_tables(execution):
+    """Table name → rows of an execution: refDS tables, then OUT_ tables of the reply.
+
+    Decoded from the raw request and reply on first use and kept on the
+    execution. Cells are strings, None as "". Parts that are not JSON
+    objects of row lists are left out.
+    """
+    tables = execution.get("tables")
+    if tables is not None:
+        return tables
+
+    tables = {}
+    ref_ds = _json_object(execution["request"]).get("refDS")
+    for table_name, rows in _json_object(ref_ds).items():
+        _add_table(tables, table_name, rows)
+
+    for key, value in _json_object(execution.get("reply")).items():
+        if key.startswith("OUT_"):
+            _add_table(tables, key, value)
+
+    execution["tables"] = tables
+    return tables
+
+class _BRParser:
+    """Line-at-a-time BR log parser pairing REQUESTQ blocks with RECEIVE_REPLYQ by UUID.
+
+    With track_orphans=True (chunk mode) replies whose request is not in
+    this parser are kept in ``orphans`` for the merge stage instead of
+    being dropped.
+    """
+
+    def __init__(self, track_orphans=False):
+        self.br_calls = []
+        self.call_positions = []
+        self.full_br_index = {}
+        self.pending = {}
+        self.requested = set()
+        self.orphans = [] if track_orphans else None
+        self.line_no = 0
+
+        self.json_buffer = []
+        self.in_json_block = False
+        self.brace_count = 0
+        self.current_uuid = None
+        self.current_ts = None  # (epoch seconds, datetime) of the open request
+
+    def feed(self, line):
+        self.index_line(line)
+        self.feed_message(line)
+        self.line_no += 1
+
+    def index_line(self, line):
+        if "BIZRULE" not in line:
+            return
+
+        space_idx = line.find(" ", 20)
+        ts_val = _br_epoch(line[:space_idx]) if space_idx != -1 else 0.0
+
+        bizrule_idx = line.find("BIZRULE]")
+        if bizrule_idx != -1:
+            name = line[bizrule_idx+8:].strip()
+            self.full_br_index.setdefault(name, []).append((ts_val, line))
+
+    def feed_message(self, line):
+        # JSON block collection
+        if self.in_json_block:
+            self.json_buffer.append(line.strip())
+            self.brace_count += line.count('{') - line.count('}')
+
+            if self.brace_count == 0:
+                self.in_json_block = False
+                self._close_request_block()
+            return
+
+        # REQUESTQ check
+        if "(REQUESTQ)" in line:
+            ts = _br_timestamp(line[:23])
+
+            match = _BR_UUID_RE.search(line)
+            if match:
+                self.current_uuid = match.group(1)
+                self.current_ts = ts
+                self.in_json_block = True
+                self.brace_count = 1
+                self.json_buffer = ["{"]
+            return
+
+        # RECEIVE_REPLYQ check
+        if "(RECEIVE_REPLYQ)" in line:
+            match = _BR_UUID_RE.search(line)
+            if not match:
+                return
+
+            uuid = match.group(1)
+            execution = self.pending.get(uuid)
+            if not execution and (self.orphans is None or uuid in self.requested):
+                return
+
+            json_start = line.find("{")
+            if json_start == -1 or not line.endswith("}"):
+                return
+            reply = line[json_start:]
+
+            if not execution:
+                # Request lives in an earlier chunk
+                self.orphans.append((self.line_no, uuid, reply))
+                return
+
+            self.pending.pop(uuid, None)
+            finish_br_execution(execution, reply)
+            self.br_calls.append(execution)
+            self.call_positions.append(self.line_no)
+
+    def _close_request_block(self):
+        uuid = self.current_uuid
+        self.requested.add(uuid)
+        self.pending[uuid] = br_request(
+            self.current_ts[1], self.current_ts[0], "".join(self.json_buffer)
+        )
+        self.json_buffer = []
+
+    def open_block(self):
+        """State of an unterminated REQUESTQ block, or None."""
+        if not self.in_json_block:
+            return None
+        return (self.current_uuid, self.current_ts, self.json_buffer, self.brace_count)
+
+    def restore_block(self, block):
+        if block is None:
+            self.in_json_block = False
+            self.json_buffer = []
+            return
+        self.current_uuid, self.current_ts, self.json_buffer, self.brace_count = block
+        self.in_json_block = True
+
+def _process_br_chunk(filepath, start, end):
+    """Process a byte range of BR log file.
+
+    Lines before the first timestamped line may belong to a JSON block
+    opened in the previous chunk; they are returned as ``prefix`` rather
+    than parsed. Unmatched requests, orphan replies and a trailing open
+    block are returned so the merge stage can pair them across chunks.
+    """
+    parser = _BRParser(track_orphans=True)
+    prefix = []
+    synced = start == 0
+
+    for line in _iter_byte_range(filepath, start, end):
+        line = line.rstrip()
+        if not line:
+            continue
+
+        if not synced:
+            if _BR_TS_RE.match(line):
+                synced = True
+            else:
+                parser.index_line(line)
+                prefix.append(line)
+                continue
+
+        parser.feed(line)
+
+    return (
+        parser.br_calls, parser.call_positions, parser.full_br_index,
+        parser.orphans, parser.pending, parser.requested,
+        synced, parser.open_block(), prefix
+    )
+
+
+# ============================================================
+# Resumable merge state (full parse + follow mode)
+# ============================================================
+def _complete_lines_end(filepath, start, size=None):
+    """Offset just past the last newline after start, or start if there is none.
+
+    A line still being written has no newline yet and is left for the
+    next read. Only the first size bytes are looked at, by default the
+    whole file. Returns the size if it is below start.
+    """
+    if size is None:
+        size = os.path.getsize(filepath)
+    if size <= start:
+        return size
+
+    with open(filepath, "rb") as f:
+        pos = size
+        while pos > start:
+            step = min(64 * 1024, pos - start)
+            f.seek(pos - step)
+            nl = f.read(step).rfind(b"\n")
+            if nl != -1:
+                return pos - step + nl + 1
+            pos -= step
+    return start
+
+def _ends_mid_line(filepath, end):
+    """True if the byte before end is not a newline (a line was cut off)."""
+    if end <= 0:
+        return False
+    with open(filepath, "rb") as f:
+        f.seek(end - 1)
+        return f.read(1) != b"\n"
+
+def _skip_line_rest(filepath, start):
+    """Offset just past the newline ending the line that start falls in, or None."""
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        rest = f.readline()
+    return start + len(rest) if rest.endswith(b"\n") else None
+
+def _read_appended(filepath, offset, mid_line):
+    """Byte range [start, end) of complete lines appended after offset.
+
+    A line that was cut off at offset was already parsed from the part
+    read back then; the rest of it is skipped. Returns None while nothing
+    new is complete, and (size, size) when the file shrank below offset.
+    """
+    size = os.path.getsize(filepath)
+    if size < offset:
+        return size, size
+
+    start = offset
+    if mid_line:
+        start = _skip_line_rest(filepath, offset)
+        if start is None:
+            return None
+
+    end = _complete_lines_end(filepath, start)
+    if end == offset:
+        return None
+    return start, end
+
+class _VariableMergeState:
+    """Variable log parse merged in file order, resumable at ``offset``.
+
+    Chunk results are merged in file order; the sequence builder keeps
+    open handshakes in ``active`` so lines appended later continue them.
+    mid_line is set when the parse stopped inside a line.
+    """
+
+    def __init__(self):
+        self.store = None
+        self.builder = _SequenceBuilder()
+        self.item_categories = {}
+        self.item_rows = {}
+        self.eqp_set = set()
+        self.skipped = 0
+        self.line_count = 0
+        self.offset = 0
+        self.mid_line = False
+
+    @property
+    def current_equipment(self):
+        return next(iter(self.eqp_set), None)
+
+    def merge(self, chunk_result):
+        """Append one chunk's rows and replay its handshake events."""
+        chunk_store, seq_events, cats, eqps, skipped, line_count = chunk_result
+
+        # Running prefix line count: first file line number of the chunk
+        line_base = self.line_count
+
+        if self.store is None:
+            self.store = chunk_store
+        else:
+            self.store.extend(chunk_store, line_base)
+
+        # Replay handshake events in file order so sequences that
+        # straddle chunk boundaries complete exactly as in one pass
+        for item, signal, val, ts, idx in seq_events:
+            self.builder.feed(item, signal, val, ts, idx + line_base)
+
+        # 🔥 FIX: Merge categories with priority to non-EQP values
+        for item_code, category in cats.items():
+            _note_category(self.item_categories, item_code, category)
+
+        self.eqp_set |= eqps
+        self.skipped += skipped
+        self.line_count += line_count
+
+    def finish(self):
+        """Sort rows by timestamp and index them by item after a full parse."""
+        self.store.sort_by_time()
+        self.item_rows = self.store.item_rows()
+
+    def append(self, chunk_result, offset):
+        """Merge rows parsed from bytes appended after the previous offset.
+
+        chunk_result may be None when the bytes only finished a cut-off
+        line. The new rows are merged into timestamp order in place (see
+        LogStore.merge_tail) and added to the end of their items' row
+        arrays. Returns None when they simply went at the end; otherwise
+        (lo, new_row) as from merge_tail, to renumber rows held elsewhere
+        with remap_rows.
+        """
+        self.offset = offset
+        self.mid_line = False
+        if chunk_result is None:
+            return None
+
+        store = self.store
+        first = len(store)
+        self.merge(chunk_result)
+
+        moved = store.merge_tail(first)
+        if moved is not None:
+            for rows in self.item_rows.values():
+                rows[:] = remap_rows(rows, *moved)
+            lo, new_row = moved
+            added = sorted(new_row[first - lo:])
+        else:
+            added = range(first, len(store))
+
+        # Appended lines come after every earlier one in file order
+        for row in sorted(added, key=store.line_no.__getitem__):
+            code = store.item_code(row)
+            if code is not None:
+                self.item_rows.setdefault(code, array("I")).append(row)
+        return moved
+
+
+class BRTimeIndex:
+    """BR executions in time order, as positions into br_calls.
+
+    ts holds the executions' ts_val ascending and positions their places
+    in br_calls (reply order), so a time window is two bisections and a
+    slice. Executions with equal times keep br_calls order. by_name keeps
+    the same order per br_name, so a window over a few rule names only
+    touches their executions.
+    """
+
+    def __init__(self, executions=(), by_name=True):
+        self.ts = array("d")
+        self.positions = array("I")
+        self.by_name = {} if by_name else None
+        self.extend(executions, 0)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def extend(self, executions, first):
+        """Index executions that were appended to br_calls at position first."""
+        new = sorted(zip([e["ts_val"] for e in executions], count(first)))
+        self._merge(new)
+        if self.by_name is None:
+            return
+
+        grouped = {}
+        for ts, pos in new:
+            grouped.setdefault(executions[pos - first]["br_name"], []).append((ts, pos))
+        for name, entries in grouped.items():
+            sub = self.by_name.get(name)
+            if sub is None:
+                sub = self.by_name[name] = BRTimeIndex(by_name=False)
+            sub._merge(entries)
+
+    def _merge(self, new):
+        """Merge sorted (ts, position) pairs.
+
+        Later executions rarely start before earlier ones, so only the
+        entries from the earliest new time on are merged again.
+        """
+        if not new:
+            return
+        cut = bisect.bisect_right(self.ts, new[0][0])
+        merged = list(heapq.merge(zip(self.ts[cut:], self.positions[cut:]), new))
+        del self.ts[cut:]
+        del self.positions[cut:]
+        self.ts.extend([ts for ts, _ in merged])
+        self.positions.extend([pos for _, pos in merged])
+
+    def _bounds(self, lo, hi):
+        return bisect.bisect_left(self.ts, lo), bisect.bisect_right(self.ts, hi)
+
+    def window(self, lo, hi, names=None):
+        """Positions of the executions with lo <= ts_val <= hi, in time order.
+
+        names, if given, limits them to those br_names.
+        """
+        if names is None:
+            start, stop = self._bounds(lo, hi)
+            return self.positions[start:stop]
+
+        parts = []
+        for name in names:
+            sub = self.by_name.get(name)
+            if sub is None:
+                continue
+            start, stop = sub._bounds(lo, hi)
+            if start < stop:
+                parts.append(zip(sub.ts[start:stop], sub.positions[start:stop]))
+        return array("I", [pos for _, pos in heapq.merge(*parts)])
+
+    def nearest(self, ts):
+        """Position of the execution closest in time to ts, or None if empty."""
+        i = bisect.bisect_left(self.ts, ts)
+        if i == len(self.ts) or (i > 0 and ts - self.ts[i - 1] <= self.ts[i] - ts):
+            i -= 1
+        return self.positions[i] if i >= 0 else None
+
+class _BRMergeState:
+    """BR log parse merged in file order, resumable at ``offset``.
+
+    br_calls and full_br_index are the collections handed to the UI. The
+    stitcher parser carries pending requests by UUID and any REQUESTQ
+    block left open at the end of the last chunk. mid_line is set when
+    the parse stopped inside a line. blob_trigrams optionally indexes each
+    execution's search_blob by its position in br_calls, built up front
+    or, with index_on_demand set, by index_blobs() when a search asks.
+    time_index orders br_calls by time.
+    """
+
+    def __init__(self, substring_index=False):
+        self.br_calls = []
+        self.full_br_index = {}
+        self.stitcher = _BRParser()
+        self.offset = 0
+        self.mid_line = False
+        self.blob_trigrams = TrigramIndex() if substring_index else None
+        self.index_on_demand = False
+        self._index_lock = threading.Lock()
+        self.time_index = BRTimeIndex()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_index_lock"]
+        return state
+
+    def __setstate__(self, state):
+        state["_index_lock"] = threading.Lock()
+        self.__dict__.update(state)
+
+    @classmethod
+    def from_parser(cls, parser, substring_index=False):
+        """Adopt a parser that read the file from the start."""
+        state = cls(substring_index)
+        state.br_calls, parser.br_calls = parser.br_calls, []
+        state.full_br_index = parser.full_br_index
+        state.stitcher = parser
+        state._index_blobs(state.br_calls, 0)
+        state.time_index.extend(state.br_calls, 0)
+        return state
+
+    def index_blobs(self):
+        """Build blob_trigrams over br_calls if there is none yet.
+
+        Assigned only once complete, and built once for searches that ask
+        at the same time, like LogStore.index_substrings().
+        """
+        with self._index_lock:
+            if self.blob_trigrams is None:
+                index = TrigramIndex()
+                for pos, execution in enumerate(self.br_calls):
+                    index.add(pos, execution["search_blob"])
+                self.blob_trigrams = index
+
+    def _index_blobs(self, executions, first):
+        if self.blob_trigrams is None:
+            return
+        for pos, execution in enumerate(executions, first):
+            self.blob_trigrams.add(pos, execution["search_blob"])
+
+    def append(self, chunk_result, offset):
+        """Merge lines appended after the previous offset; returns new executions."""
+        self.offset = offset
+        self.mid_line = False
+        if chunk_result is None:
+            return []
+        return self.merge(chunk_result)
+
+    def merge(self, chunk_result):
+        """Pair one chunk's requests and replies with earlier chunks.
+
+        Returns the executions completed by this chunk, in file order.
+        """
+        (br_calls, positions, br_index, orphans, unmatched, requested,
+            synced, open_block, prefix) = chunk_result
+        stitcher = self.stitcher
+        added = []
+
+        # Finish a block opened in the previous chunk
+        stitched = len(stitcher.br_calls)
+        for line in prefix:
+            stitcher.feed_message(line)
+        added.extend(stitcher.br_calls[stitched:])
+
+        # Replies whose request was still pending from earlier chunks
+        paired = []
+        for pos, uuid, reply in orphans:
+            execution = stitcher.pending.pop(uuid, None)
+            if execution:
+                finish_br_execution(execution, reply)
+                paired.append((pos, execution))
+
+        # Keep reply order within the chunk
+        local = list(zip(positions, br_calls))
+        added.extend(
+            e for _, e in heapq.merge(local, paired, key=lambda x: x[0])
+        )
+
+        # Requests seen here supersede older ones with the same UUID
+        for uuid in requested:
+            stitcher.pending.pop(uuid, None)
+        stitcher.pending.update(unmatched)
+        if synced:
+            stitcher.restore_block(open_block)
+
+        # Merge index
+        for name, entries in br_index.items():
+            self.full_br_index.setdefault(name, []).extend(entries)
+
+        self._index_blobs(added, len(self.br_calls))
+        self.time_index.extend(added, len(self.br_calls))
+        self.br_calls.extend(added)
+        return added
+
+
+# ============================================================
+# Full and appended parses (run by the QThread workers)
+# ============================================================
+def _full_parse_span(filepath, kind, complete_lines):
+    """(cache key, keyed size, cached state or None, end) of a full parse.
+
+    The key is taken before parsing, and the parse covers the bytes
+    [0, end) of the keyed size, so a log still growing is cached with
+    exactly the lines it holds. With complete_lines (follow mode) end is
+    just past the last newline: a line still being written is left whole
+    for the tail parse, and a cached parse that ended inside one is not
+    used.
+    """
+    key, size = parse_cache.cache_key(filepath, kind)
+    cached = parse_cache.load(key)
+    if (cached is not None and cached.offset == size
+            and not (complete_lines and cached.mid_line)):
+        return key, size, cached, size
+
+    end = _complete_lines_end(filepath, 0, size) if complete_lines else size
+    return key, size, None, end
+
+def parse_variable_log(filepath, lazy_text=False, substring_index=False, complete_lines=False):
+    """Parse a variable log into a _VariableMergeState, from the cache when possible.
+
+    complete_lines stops the parse after the last newline (see
+    _full_parse_span); set it when the log is being followed.
+    """
+    key, key_size, cached, file_size = _full_parse_span(filepath, "variable", complete_lines)
+    if cached is not None:
+        return cached
+
+    state = _VariableMergeState()
+
+    # Only parallelize for large files
+    if file_size > VARIABLE_PARALLEL_BYTES:
+        # STEP 1: Split file into newline-aligned byte ranges
+        chunk_ranges = _split_file_by_bytes(filepath, process_pool.worker_count(), file_size)
+
+        # Line text comes back through shared memory rather than the result
+        # pipe; a chunk's text is at most its bytes plus a final newline.
+        # A chunk's block is created as it is submitted and freed once merged.
+        blocks = deque()
+
+        def chunk_args():
+            for start, end in chunk_ranges:
+                block = None
+                if not lazy_text:
+                    block = shared_memory.SharedMemory(create=True, size=end - start + 1)
+                blocks.append(block)
+                yield filepath, start, end, lazy_text, substring_index, block and block.name
+
+        try:
+            # STEP 2: Process chunks in the shared pool
+            with process_pool.Lease() as lease, \
+                    closing(lease.starmap(_process_variable_chunk, chunk_args())) as chunk_results:
+                # STEP 3: Merge in file order; text is copied once, straight
+                # from each chunk's block into the merged store
+                state.store = LogStore(file_backed=lazy_text, trigrams=substring_index)
+                for chunk_result in chunk_results:
+                    block = blocks[0]
+                    if block is None:
+                        state.merge(chunk_result)
+                    else:
+                        chunk_store = chunk_result[0]
+                        _attach_text(chunk_store, block)
+                        try:
+                            state.merge(chunk_result)
+                        finally:
+                            chunk_store.text.release()
+                    _free_block(blocks.popleft())
+        finally:
+            for block in blocks:
+                _free_block(block)
+        end = chunk_ranges[-1][1] if chunk_ranges else 0
+    else:
+        state.merge(
+            _process_variable_chunk(filepath, 0, file_size, lazy_text, substring_index)
+        )
+        end = file_size
+
+    # Sort rows by timestamp
+    state.finish()
+    state.offset, state.mid_line = end, _ends_mid_line(filepath, end)
+
+    if state.skipped > 0:
+        print(f"⚠ Skipped {state.skipped:,} invalid lines during variable log load")
+
+    if end == key_size:
+        parse_cache.save(key, state)
+    return state
+
+
+def parse_variable_appended(filepath, state):
+    """Parse complete lines appended to a variable log since state was read.
+
+    Returns (chunk result or None, end offset), or (None, None) when
+    nothing new is complete. Merge the result with state.append; an end
+    offset below state.offset means the file was truncated.
+    """
+    span = _read_appended(filepath, state.offset, state.mid_line)
+    if span is None:
+        return None, None
+
+    start, end = span
+    result = None
+    if end > start:
+        result = _process_variable_chunk(
+            filepath, start, end, state.store.file_backed, state.store.trigrams is not None
+        )
+    return result, end
+
+
+def parse_br_log(filepath, substring_index=False, complete_lines=False):
+    """Parse a BR log into a _BRMergeState, from the cache when possible.
+
+    complete_lines is as for parse_variable_log.
+    """
+    key, key_size, cached, file_size = _full_parse_span(filepath, "br", complete_lines)
+    if cached is not None:
+        return cached
+
+    # Parallelize for large files
+    if file_size > BR_PARALLEL_BYTES:
+        # STEP 1: Split file into newline-aligned byte ranges
+        chunk_ranges = _split_file_by_bytes(filepath, process_pool.worker_count(), file_size)
+
+        # STEP 2: Process chunks in the shared pool
+        with process_pool.Lease() as lease:
+            chunk_results = lease.starmap(_process_br_chunk, [
+                (filepath, start, end) for start, end in chunk_ranges
+            ])
+
+            # STEP 3: Merge results, pairing requests and replies across chunks
+            state = _BRMergeState(substring_index)
+            for chunk_result in chunk_results:
+                state.merge(chunk_result)
+        end = chunk_ranges[-1][1] if chunk_ranges else 0
+    else:
+        parser = _BRParser()
+
+        for line in _iter_byte_range(filepath, 0, file_size):
+            line = line.rstrip()
+            if not line:
+                continue
+            parser.feed(line)
+
+        state = _BRMergeState.from_parser(parser, substring_index)
+        end = file_size
+
+    state.offset, state.mid_line = end, _ends_mid_line(filepath, end)
+    if end == key_size:
+        parse_cache.save(key, state)
+    return state
+
+
+def parse_br_appended(filepath, state):
+    """Parse complete lines appended to a BR log since state was read.
+
+    Returns like parse_variable_appended; merge the result with
+    state.append to pair it with earlier requests.
+    """
+    span = _read_appended(filepath, state.offset, state.mid_line)
+    if span is None:
+        return None, None
+
+    start, end = span
+    result = None
+    if end > start:
+        result = _process_br_chunk(filepath, start, end)
+    return result, end
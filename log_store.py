@@ -0,0 +1,713 @@
+# log_store.py
+"""
+Columnar storage for parsed variable log lines.
+
+One LogStore replaces the per-line LogLine objects: timestamps live in an
+array('d'), item codes and (system, category) pairs are interned to small
+ints, and the raw text sits in a single UTF-8 buffer addressed by per-row
+offsets. Rows are decoded only when something asks for them.
+
+A file-backed store keeps no text at all: row offsets point into the
+source log, which is memory-mapped once parsing is done.
+
+Every row's word tokens are indexed to sorted row arrays so searches for
+IDs, item codes and signals skip scanning the text. An optional trigram
+index narrows down arbitrary substring searches the same way; it can be
+built up front or on the first search that needs it.
+"""
+import bisect
+import heapq
+import mmap
+import operator
+import re
+import threading
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from itertools import compress, count, islice
+
+from ngram_index import TrigramIndex
+
+# Search scans the text buffer in blocks of about this many bytes
+SEARCH_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Streamed searches that must scan return results per window of this many rows
+SEARCH_BATCH_ROWS = 100_000
+
+# Decoded rows kept for file-backed stores (a screenful is a few dozen)
+RAW_CACHE_SIZE = 4096
+
+# Indexed tokens: ASCII word runs after the timestamp, lowercased
+_TOKEN_RE = re.compile(rb"\w+")
+_TS_LEN = 19
+
+
+def _indexable(term):
+    """True if the token index answers a search for term.
+
+    A term made only of word characters lies inside one token wherever it
+    occurs; all-digit terms may also match the unindexed timestamp.
+    """
+    return _TOKEN_RE.fullmatch(term) is not None and not term.isdigit()
+
+
+# Characters of a "YYYY-MM-DD HH:MM:SS" timestamp
+_TS_CHARS = frozenset(b"0123456789-: ")
+
+
+def _trigram_indexable(term):
+    """True if term is long enough and cannot start early in the timestamp.
+
+    Trigrams are indexed from the last two digits of a parsed timestamp;
+    a term whose first two characters are not both timestamp characters
+    never begins before them.
+    """
+    return len(term) >= 3 and not (term[0] in _TS_CHARS and term[1] in _TS_CHARS)
+
+
+def _intersect(a, b):
+    """Sorted rows present in both sorted arrays."""
+    if len(a) > len(b):
+        a, b = b, a
+    b = set(b)
+    return array("I", [r for r in a if r in b])
+
+
+def _clip(rows, lo, hi):
+    return rows[bisect.bisect_left(rows, lo):bisect.bisect_left(rows, hi)]
+
+
+def _pack_postings(postings):
+    """(keys, counts, rows) holding a key → rows dict in three objects.
+
+    Thousands of small arrays pickle several times slower than one array
+    of the same rows.
+    """
+    rows = array("I")
+    for ids in postings.values():
+        rows.extend(ids)
+    return list(postings), array("I", map(len, postings.values())), rows
+
+
+def _unpack_postings(packed):
+    keys, counts, rows = packed
+    postings = {}
+    pos = 0
+    for key, n in zip(keys, counts):
+        postings[key] = rows[pos:pos + n]
+        pos += n
+    return postings
+
+
+def remap_rows(rows, lo, new_row):
+    """rows renumbered after LogStore.merge_tail() returned (lo, new_row).
+
+    Rows from before the merge keep their relative order, so a sorted
+    sequence stays sorted. rows itself is returned if none of them moved.
+    """
+    if not rows or max(rows) < lo:
+        return rows
+    return array("I", [r if r < lo else new_row[r - lo] for r in rows])
+
+
+class _Interner:
+    """Maps repeated strings to small ints; None maps to -1."""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, value):
+        if value is None:
+            return -1
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+    def get(self, i):
+        return self.values[i] if i >= 0 else None
+
+
+class LogStore:
+    """Variable log lines stored column-wise.
+
+    Rows are appended in file order and put in timestamp order by
+    sort_by_time(), or by merge_tail() for rows appended to sorted ones. ts is 0.0 for lines whose timestamp did not parse.
+
+    With file_backed=True the rows' starts are byte offsets into the
+    source file; call attach() with its path before reading any text.
+    With trigrams=True rows are also added to a TrigramIndex. Otherwise,
+    with index_on_demand set, the first search for a substring the token
+    index cannot answer builds one with index_substrings().
+    """
+
+    def __init__(self, file_backed=False, trigrams=False):
+        self.file_backed = file_backed
+        self.ts = array("d")
+        self.line_no = array("I")
+        self.item_ids = array("i")
+        self.block_ids = array("i")
+        self.starts = array("Q")
+        self.lengths = array("I")
+        self.text = None if file_backed else bytearray()
+        self._raw_cache = None
+        self._breaks = None
+
+        # token → sorted array of rows containing it
+        self.token_rows = {}
+        # (tokens, TrigramIndex over them) for terms inside longer tokens;
+        # tokens are only ever added, so it catches up by position
+        self._key_index = None
+        # Held while an index is built on demand by a search thread
+        self._index_lock = threading.Lock()
+        self.trigrams = TrigramIndex() if trigrams else None
+        self.index_on_demand = False
+
+        self.items = _Interner()
+        # (system, category) of each distinct system block
+        self.blocks = _Interner()
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_raw_cache"] = None
+        state["_key_index"] = None
+        del state["_index_lock"]
+        if self.file_backed:
+            # The mapping is reopened by attach()
+            state["text"] = None
+        state["token_rows"] = _pack_postings(self.token_rows)
+        return state
+
+    def __setstate__(self, state):
+        state["token_rows"] = _unpack_postings(state["token_rows"])
+        state["_key_index"] = None
+        state["_index_lock"] = threading.Lock()
+        self.__dict__.update(state)
+
+    # -----------------------------
+    # Building
+    # -----------------------------
+    def block_id(self, system, category):
+        """Small-int id of a (system, category) pair, for append()."""
+        return self.blocks.intern((system, category))
+
+    def append(self, ts_val, line_no, raw, item_code, block_id, offset=0):
+        """Add one line; raw is the UTF-8 encoded line without newline.
+
+        block_id comes from block_id(). offset is the line's position in
+        the source file; only file-backed stores use it.
+        """
+        self.ts.append(ts_val)
+        self.line_no.append(line_no)
+        if self.file_backed:
+            self.starts.append(offset)
+        else:
+            self.starts.append(len(self.text))
+            self.text += raw
+            self.text += b"\n"
+        self.lengths.append(len(raw))
+        self._breaks = None
+
+        # Skip a parsed timestamp unless a word runs on past it
+        lowered = raw.lower()
+        pos = _TS_LEN if ts_val else 0
+        row = len(self.ts) - 1
+        token_rows = self.token_rows
+        for token in set(_TOKEN_RE.findall(
+                lowered, 0 if _TOKEN_RE.match(raw, pos) else pos)):
+            rows = token_rows.get(token)
+            if rows is None:
+                token_rows[token] = array("I", (row,))
+            else:
+                rows.append(row)
+
+        if self.trigrams is not None:
+            # Start two bytes early for terms that begin on the last digits
+            self.trigrams.add(row, lowered, max(pos - 2, 0))
+
+        self.item_ids.append(self.items.intern(item_code))
+        self.block_ids.append(block_id)
+
+    def extend(self, other, line_base=0):
+        """Append all rows of another store, shifting its line numbers by line_base."""
+        def remap(ids, interner, other_interner):
+            mapping = [interner.intern(v) for v in other_interner.values]
+            return (mapping[i] if i >= 0 else -1 for i in ids)
+
+        base = len(self)
+        if self.trigrams is not None and other.trigrams is not None:
+            self.trigrams.extend(other.trigrams, base)
+        for token, rows in other.token_rows.items():
+            if base:
+                rows = array("I", map(base.__add__, rows))
+            mine = self.token_rows.get(token)
+            if mine is None:
+                self.token_rows[token] = rows
+            else:
+                mine.extend(rows)
+
+        self.ts.extend(other.ts)
+        self.line_no.extend(n + line_base for n in other.line_no)
+        if self.file_backed:
+            self.starts.extend(other.starts)
+        else:
+            shift = len(self.text)
+            self.starts.extend(s + shift for s in other.starts)
+            self.text += other.text
+        self.lengths.extend(other.lengths)
+        self._breaks = None
+        self.item_ids.extend(remap(other.item_ids, self.items, other.items))
+        self.block_ids.extend(remap(other.block_ids, self.blocks, other.blocks))
+        if self.trigrams is not None and other.trigrams is None:
+            # Parsed before this store's index was built on demand
+            self._index_trigrams(self.trigrams, base)
+
+    def index_substrings(self):
+        """Build the trigram index over all rows if there is none yet.
+
+        The index is assigned only once complete, so a search running in
+        another thread sees either no index or a whole one. Searches that
+        ask while it is being built wait for that build.
+        """
+        with self._index_lock:
+            if self.trigrams is None:
+                index = TrigramIndex()
+                self._index_trigrams(index, 0)
+                self.trigrams = index
+
+    def _index_trigrams(self, index, first):
+        for row in range(first, len(self)):
+            # From the last two timestamp digits, as append() indexes
+            index.add(row, bytes(self._lowered(row)), _TS_LEN - 2 if self.ts[row] else 0)
+
+    def sort_by_time(self):
+        """Stable-sort rows by timestamp.
+
+        An in-memory text buffer is rebuilt in the new order; a file-backed
+        store only permutes its offsets.
+        """
+        ts = self.ts
+        if not any(map(operator.gt, ts, islice(ts, 1, None))):
+            return
+
+        order = sorted(range(len(ts)), key=ts.__getitem__)
+
+        def permute(col):
+            return array(col.typecode, map(col.__getitem__, order))
+
+        self.ts = permute(self.ts)
+        self.line_no = permute(self.line_no)
+        self.item_ids = permute(self.item_ids)
+        self.block_ids = permute(self.block_ids)
+        self._breaks = None
+
+        # Renumber token postings: new_row[old] is the row's new position
+        new_row = array("I", bytes(4 * len(order)))
+        for new, old in enumerate(order):
+            new_row[old] = new
+        remap = new_row.__getitem__
+        self.token_rows = {
+            token: array("I", sorted(map(remap, rows)))
+            for token, rows in self.token_rows.items()
+        }
+        if self.trigrams is not None:
+            self.trigrams.renumber(new_row)
+
+        if self.file_backed:
+            self.starts = permute(self.starts)
+            self.lengths = permute(self.lengths)
+            return
+
+        # Rebuild the buffer so rows stay contiguous for search
+        text, starts, lengths = self.text, self.starts, self.lengths
+        new_text = bytearray()
+        new_starts = array("Q")
+        for row in order:
+            s = starts[row]
+            new_starts.append(len(new_text))
+            new_text += text[s:s + lengths[row]]
+            new_text += b"\n"
+        self.text = new_text
+        self.starts = new_starts
+        self.lengths = permute(lengths)
+
+    def merge_tail(self, first):
+        """Move the rows appended from first on into timestamp order.
+
+        The rows before first must be sorted already. Each appended row
+        goes after the rows with an equal timestamp, as in sort_by_time(),
+        but only the rows from the first insertion point on are touched
+        and the text buffer is left as it is.
+
+        Returns None if no row moved, else (lo, new_row): rows below lo
+        kept their place and new_row[row - lo] is the new place of a row
+        from lo on. Rows from before first keep their relative order.
+        """
+        ts = self.ts
+        n = len(ts)
+        tail = sorted(range(first, n), key=ts.__getitem__)
+        if not tail:
+            return None
+        lo = bisect.bisect_right(ts, ts[tail[0]], 0, first)
+        if lo == first and tail == list(range(first, n)):
+            return None
+
+        order = list(heapq.merge(range(lo, first), tail, key=ts.__getitem__))
+
+        def permute(col):
+            col[lo:] = array(col.typecode, map(col.__getitem__, order))
+
+        for col in (self.ts, self.line_no, self.item_ids, self.block_ids,
+                    self.starts, self.lengths):
+            permute(col)
+        self._breaks = None
+        if self._raw_cache is not None:
+            self._raw_cache.cache_clear()
+
+        new_row = array("I", bytes(4 * (n - lo)))
+        for new, old in enumerate(order, lo):
+            new_row[old - lo] = new
+
+        for rows in self.token_rows.values():
+            if rows[-1] < lo:
+                continue
+            k = bisect.bisect_left(rows, lo)
+            rows[k:] = array("I", sorted(new_row[r - lo] for r in rows[k:]))
+        if self.trigrams is not None:
+            self.trigrams.renumber_from(lo, new_row)
+        return lo, new_row
+
+    def item_rows(self):
+        """item_code → array of rows for that item, in file order."""
+        line_no = self.line_no
+        rows = range(len(self))
+        if any(map(operator.gt, line_no, islice(line_no, 1, None))):
+            rows = sorted(rows, key=line_no.__getitem__)
+
+        item_ids = self.item_ids
+        buckets = [array("I") for _ in self.items.values]
+        for row in rows:
+            item_id = item_ids[row]
+            if item_id >= 0:
+                buckets[item_id].append(row)
+        return dict(zip(self.items.values, buckets))
+
+    def attach(self, filepath):
+        """Memory-map the source file of a file-backed store."""
+        with open(filepath, "rb") as f:
+            try:
+                self.text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                self.text = b""
+        self._raw_cache = lru_cache(maxsize=RAW_CACHE_SIZE)(self._decode)
+
+    # -----------------------------
+    # Row access
+    # -----------------------------
+    def raw(self, row):
+        if self._raw_cache is not None:
+            return self._raw_cache(row)
+        return self._decode(row)
+
+    def _decode(self, row):
+        s = self.starts[row]
+        return self.text[s:s + self.lengths[row]].decode("utf-8", errors="ignore")
+
+    def datetime_at(self, row):
+        ts_val = self.ts[row]
+        return datetime.fromtimestamp(ts_val) if ts_val else None
+
+    def item_code(self, row):
+        return self.items.get(self.item_ids[row])
+
+    def system(self, row):
+        return self.blocks.values[self.block_ids[row]][0]
+
+    def category(self, row):
+        return self.blocks.values[self.block_ids[row]][1]
+
+    def view(self, rows=None):
+        return LogView(self, rows)
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def search(self, and_terms, or_terms, lo=0, hi=None):
+        """Rows in [lo, hi) whose text contains every AND term and any OR term.
+
+        Terms are casefolded strings; the text is matched ASCII-lowercased.
+        A word-like term matches the rows of every token containing it,
+        found through a trigram index over the tokens. Other terms are
+        narrowed by the trigram index over the rows when there is one;
+        only what the indexes cannot settle is checked against the text.
+        """
+        hi = len(self) if hi is None else hi
+        if lo >= hi:
+            return array("I")
+
+        and_terms = [t.encode("utf-8") for t in and_terms]
+        or_terms = [t.encode("utf-8") for t in or_terms]
+        self._ensure_trigrams(and_terms + or_terms)
+
+        and_found = [self._indexed_rows(t, lo, hi) for t in and_terms]
+        or_found = [self._indexed_rows(t, lo, hi) for t in or_terms]
+        indexed_or = bool(or_terms) and None not in or_found
+        if indexed_or or any(f is not None for f in and_found):
+            return self._search_indexed(and_terms, and_found, or_terms, or_found, indexed_or)
+
+        if and_terms:
+            and_terms.sort(key=len, reverse=True)
+            rows = self._rows_containing(and_terms[0], lo, hi)
+            rest = and_terms[1:]
+            if rest:
+                rows = [r for r in rows if all(t in self._lowered(r) for t in rest)]
+            if or_terms:
+                rows = [r for r in rows if any(t in self._lowered(r) for t in or_terms)]
+            return array("I", rows)
+
+        if or_terms:
+            found = set()
+            for t in or_terms:
+                found.update(self._rows_containing(t, lo, hi))
+            return array("I", sorted(found))
+
+        return range(lo, hi)
+
+    def iter_search(self, and_terms, or_terms, lo=0, hi=None, batch_rows=SEARCH_BATCH_ROWS):
+        """search() results as ascending batches of rows.
+
+        A search the indexes can answer comes back in one batch; one that
+        has to scan the text yields after every batch_rows rows, so callers
+        can show the first hits early and stop between batches.
+        """
+        hi = len(self) if hi is None else hi
+        and_bytes = [t.encode("utf-8") for t in and_terms]
+        or_bytes = [t.encode("utf-8") for t in or_terms]
+        self._ensure_trigrams(and_bytes + or_bytes)
+        if (
+            not (and_bytes or or_bytes)
+            or any(map(self._has_index, and_bytes))
+            or (or_bytes and all(map(self._has_index, or_bytes)))
+        ):
+            yield self.search(and_terms, or_terms, lo, hi)
+            return
+
+        for batch_lo in range(lo, hi, batch_rows):
+            yield self.search(and_terms, or_terms, batch_lo, min(batch_lo + batch_rows, hi))
+
+    def _ensure_trigrams(self, terms):
+        """Build the trigram index if allowed and some term needs it.
+
+        A term needs it when it is long enough to narrow and is not
+        word-like, which the token index answers.
+        """
+        if self.trigrams is None and self.index_on_demand and any(
+            _trigram_indexable(t) and not _indexable(t) for t in terms
+        ):
+            self.index_substrings()
+
+    def _has_index(self, term):
+        return _indexable(term) or (self.trigrams is not None and _trigram_indexable(term))
+
+    def _indexed_rows(self, term, lo, hi):
+        """(rows, exact) for term from an index, or None if no index covers it.
+
+        Inexact rows are trigram candidates that still need checking.
+        """
+        if _indexable(term):
+            return _clip(self._token_match(term), lo, hi), True
+        if self.trigrams is not None and _trigram_indexable(term):
+            return self.trigrams.candidates(term, lo, hi), False
+        return None
+
+    def _search_indexed(self, and_terms, and_found, or_terms, or_found, indexed_or):
+        rows = None
+        check = []
+        for t, found in zip(and_terms, and_found):
+            if found is None:
+                check.append(t)
+                continue
+            found, exact = found
+            rows = found if rows is None else _intersect(rows, found)
+            if not exact:
+                check.append(t)
+
+        if indexed_or:
+            union = set()
+            for found, _ in or_found:
+                union.update(found)
+            union = array("I", sorted(union))
+            rows = union if rows is None else _intersect(rows, union)
+            if all(exact for _, exact in or_found):
+                or_terms = []
+
+        if check or or_terms:
+            rows = [
+                r for r in rows
+                if all(t in self._lowered(r) for t in check)
+                and (not or_terms or any(t in self._lowered(r) for t in or_terms))
+            ]
+        return array("I", rows)
+
+    def _token_match(self, term):
+        """Sorted rows with a token containing term."""
+        token_rows = self.token_rows
+        postings = [token_rows[token] for token in self._tokens_containing(term)]
+        if len(postings) == 1:
+            return postings[0]
+        return array("I", sorted(set().union(*postings)))
+
+    def _tokens_containing(self, term):
+        """Distinct tokens that contain term.
+
+        Terms too short for trigrams scan every token; longer ones check
+        only the candidates of a trigram index over the tokens, which is
+        built on first use and extended with tokens added since.
+        """
+        if len(term) < 3:
+            return [token for token in self.token_rows if term in token]
+
+        with self._index_lock:
+            if self._key_index is None:
+                self._key_index = ([], TrigramIndex())
+            tokens, index = self._key_index
+            for i, token in enumerate(islice(self.token_rows, len(tokens), None), len(tokens)):
+                tokens.append(token)
+                index.add(i, token)
+            ids = index.candidates(term)
+        return [tokens[i] for i in ids if term in tokens[i]]
+
+    def _lowered(self, row):
+        s = self.starts[row]
+        return self.text[s:s + self.lengths[row]].lower()
+
+    def _run_breaks(self):
+        """Rows whose text starts before the previous row's.
+
+        Between two breaks, rows appear in the text in row order, which
+        lets search scan them as one stretch of the buffer.
+        """
+        if self._breaks is None:
+            starts = self.starts
+            self._breaks = array("I", compress(
+                count(1), map(operator.lt, islice(starts, 1, None), starts)
+            ))
+        return self._breaks
+
+    def _rows_containing(self, term, lo, hi):
+        """Rows in [lo, hi) containing term, scanning ordered runs of rows."""
+        breaks = self._run_breaks()
+        rows = []
+        run_lo = lo
+        for run_hi in islice(breaks, bisect.bisect_right(breaks, lo), None):
+            if run_hi >= hi:
+                break
+            rows += self._scan_run(term, run_lo, run_hi)
+            run_lo = run_hi
+        rows += self._scan_run(term, run_lo, hi)
+        return rows
+
+    def _scan_run(self, term, lo, hi):
+        """Scan the buffer block by block; rows [lo, hi) appear in it in order."""
+        starts, lengths, text = self.starts, self.lengths, self.text
+        rows = []
+        block_lo = lo
+        while block_lo < hi:
+            block_hi = bisect.bisect_left(
+                starts, starts[block_lo] + SEARCH_BLOCK_BYTES, block_lo + 1, hi
+            )
+            base = starts[block_lo]
+            blob = text[base:starts[block_hi - 1] + lengths[block_hi - 1]].lower()
+
+            pos = blob.find(term)
+            while pos != -1:
+                row = bisect.bisect_right(starts, base + pos, block_lo, block_hi) - 1
+                row_end = starts[row] + lengths[row] - base
+                if pos + len(term) <= row_end:
+                    rows.append(row)
+                    pos = blob.find(term, row_end)
+                else:
+                    pos = blob.find(term, pos + 1)
+
+            block_lo = block_hi
+        return rows
+
+
+class LogRow:
+    """Lightweight handle for one store row, created on demand."""
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def raw(self):
+        return self.store.raw(self.row)
+
+    @property
+    def ts(self):
+        return self.store.datetime_at(self.row)
+
+    @property
+    def original_index(self):
+        return self.store.line_no[self.row]
+
+    @property
+    def item_code(self):
+        return self.store.item_code(self.row)
+
+    @property
+    def system(self):
+        return self.store.system(self.row)
+
+    @property
+    def category(self):
+        return self.store.category(self.row)
+
+
+class LogView:
+    """A sequence of store rows shown together: the whole log, a slice or a filtered subset."""
+    __slots__ = ("store", "rows")
+
+    def __init__(self, store, rows=None):
+        self.store = store
+        self.rows = range(len(store)) if rows is None else rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return LogView(self.store, self.rows[i])
+        return LogRow(self.store, self.rows[i])
+
+    def __iter__(self):
+        store = self.store
+        for row in self.rows:
+            yield LogRow(store, row)
+
+    def raw(self, i):
+        return self.store.raw(self.rows[i])
+
+    def original_index(self, i):
+        return self.store.line_no[self.rows[i]]
+
+    def subset(self, rows):
+        """View over the given store rows."""
+        return LogView(self.store, rows)
+
+    def time_range(self):
+        """(first, last) datetime of the view, skipping unparsed timestamps."""
+        ts = self.store.ts
+        first = next((ts[r] for r in self.rows if ts[r]), None)
+        if first is None:
+            return None
+        last = next(ts[r] for r in reversed(self.rows) if ts[r])
+        return datetime.fromtimestamp(first), datetime.fromtimestamp(last)
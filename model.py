@@ -1,12 +1,19 @@
 ﻿# model.py
+import bisect
+from array import array
 from dataclasses import dataclass
-from PySide6.QtCore import QDateTime, Qt, QAbstractListModel, QModelIndex
+from PySide6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QBrush, QColor
+
+from log_parser import br_tables
 
 @dataclass
 class LogLine:
     raw: str
 
 class LogListModel(QAbstractListModel):
+    """List model over a log_store.LogView; row text is decoded on demand."""
+
     def __init__(self, logs=None):
         super().__init__()
         self.logs = logs or []
@@ -18,17 +25,321 @@ class LogListModel(QAbstractListModel):
         if not index.isValid():
             return None
 
-        log = self.logs[index.row()]
-
         if role == Qt.DisplayRole:
-            return log.raw
+            return self.logs.raw(index.row())
 
         if role == Qt.UserRole:
-            return log.original_index
+            return self.logs.original_index(index.row())
 
         return None
 
     def setLogs(self, logs):
         self.beginResetModel()
         self.logs = logs
-        self.endResetModel()
\ No newline at end of file
+        self.endResetModel()
+
+    def appendLogs(self, logs):
+        """Switch to logs whose leading rows are the current ones, inserting the rest."""
+        first = len(self.logs)
+        if len(logs) <= first:
+            self.logs = logs
+            return
+
+        self.beginInsertRows(QModelIndex(), first, len(logs) - 1)
+        self.logs = logs
+        self.endInsertRows()
+
+    def appendRows(self, rows):
+        """Insert store rows after the current ones; the view must hold an array of rows."""
+        if not rows:
+            return
+
+        first = len(self.logs)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.logs.rows.extend(rows)
+        self.endInsertRows()
+
+    def renumberRows(self, rows):
+        """Point the view at new store rows for the same lines, as after LogStore.merge_tail."""
+        if rows is self.logs.rows:
+            return
+        self.logs.rows = rows
+        if rows:
+            self.dataChanged.emit(self.index(0), self.index(len(rows) - 1))
+
+
+EXCEPTION_BR = "BR_SYS_REG_BIZRULE_EXCEPTION"
+
+_INDENT = "    "
+
+
+class BRExecutionModel(QAbstractTableModel):
+    """BR executions in time order as a flattened tree, one column.
+
+    Each execution is a row; expanding it splices rows for its tables in
+    below it, and expanding a table rows for its "column: value" cells.
+    Tables are decoded (br_tables) only for expanded executions, and the row of an
+    execution is found from its ts_val by bisection, so the view only
+    ever asks for the rows it shows. Shown instead of executions,
+    messages are plain rows.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executions = []
+        self.order = None       # array of positions into executions, or None
+        self.ts = array("d")    # ts_val of each execution row, ascending
+        self.count = 0          # execution rows
+        self.last_ts = None     # ts_val of the last execution row
+        self.messages = None
+        self.highlighted = set()
+        self._clear_expanded()
+
+    def _clear_expanded(self):
+        self.expanded = {}      # execution row → (execution, expanded table indexes)
+        self._spans()
+
+    # -----------------------------
+    # Contents
+    # -----------------------------
+    def set_executions(self, executions, time_index=None):
+        """Show executions; time_index, if it orders exactly these, is used as is.
+
+        Otherwise they are shown sorted by ts_val. An index passed in may
+        grow afterwards, see grow().
+        """
+        self.beginResetModel()
+        self.messages = None
+        if time_index is not None and len(time_index) == len(executions):
+            self.executions = executions
+            self.order = time_index.positions
+            self.ts = time_index.ts
+        else:
+            self.executions = sorted(executions, key=lambda e: e["ts_val"])
+            self.order = None
+            self.ts = array("d", [e["ts_val"] for e in self.executions])
+        self.count = len(self.ts)
+        self.last_ts = self.ts[-1] if self.count else None
+        self._clear_expanded()
+        self.endResetModel()
+
+    def set_messages(self, messages):
+        """Show lines of text instead of executions."""
+        self.beginResetModel()
+        self.executions = []
+        self.order = None
+        self.ts = array("d")
+        self.count = 0
+        self.last_ts = None
+        self.messages = list(messages)
+        self._clear_expanded()
+        self.endResetModel()
+
+    def grow(self, earliest_ts):
+        """Take in rows the time index gained; earliest_ts is the earliest new ts_val.
+
+        Rows after the current ones are inserted; rows that sort between
+        them reset the model, keeping expanded executions expanded. The
+        index has already merged the new rows, so they are placed against
+        last_ts, the last row shown before them.
+        """
+        new_count = len(self.ts)
+        if self.order is None or new_count == self.count:
+            return
+
+        if self.count == 0 or earliest_ts >= self.last_ts:
+            first = self.rowCount()
+            self.beginInsertRows(QModelIndex(), first, first + new_count - self.count - 1)
+            self.count = new_count
+            self.endInsertRows()
+        else:
+            self.beginResetModel()
+            self.count = new_count
+            expanded = self.expanded.values()
+            self.expanded = {self.row_of(e): (e, tables) for e, tables in expanded}
+            self._spans()
+            self.endResetModel()
+        self.last_ts = self.ts[new_count - 1]
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    def execution(self, row):
+        """Execution of an execution row (not a display row)."""
+        if self.order is not None:
+            return self.executions[self.order[row]]
+        return self.executions[row]
+
+    def row_of(self, execution):
+        """Execution row of execution, or None if it is not shown."""
+        ts = execution.get("ts_val")
+        if ts is None:
+            return None
+        lo = bisect.bisect_left(self.ts, ts, 0, self.count)
+        hi = bisect.bisect_right(self.ts, ts, lo, self.count)
+        for row in range(lo, hi):
+            if self.execution(row) is execution:
+                return row
+        return None
+
+    def row_like(self, execution):
+        """Execution row of a shown execution with the same ts_val and br_name, or None."""
+        ts = execution.get("ts_val")
+        if ts is None:
+            return None
+        lo = bisect.bisect_left(self.ts, ts, 0, self.count)
+        hi = bisect.bisect_right(self.ts, ts, lo, self.count)
+        for row in range(lo, hi):
+            if self.execution(row).get("br_name") == execution.get("br_name"):
+                return row
+        return None
+
+    def set_highlighted(self, executions):
+        """Highlight these executions (and no others)."""
+        changed = self.highlighted ^ {id(e) for e in executions}
+        self.highlighted = {id(e) for e in executions}
+        if changed and self.rowCount():
+            # Only the shown rows repaint
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self.rowCount() - 1, 0),
+                [Qt.BackgroundRole, Qt.ForegroundRole]
+            )
+
+    # -----------------------------
+    # Expanded executions
+    # -----------------------------
+    def _spans(self):
+        """Recompute where expanded executions and their detail rows sit."""
+        self._expanded_rows = sorted(self.expanded)
+        self._details = []      # per expanded row: [(depth, text, table index)]
+        self._starts = []       # per expanded row: its display row
+        extra = 0
+        for row in self._expanded_rows:
+            execution, tables = self.expanded[row]
+            details = []
+            for i, (name, rows) in enumerate(br_tables(execution).items()):
+                details.append((1, name, i))
+                if i in tables:
+                    details.extend(
+                        (2, f"{col}: {val}", None) for r in rows for col, val in r.items()
+                    )
+            self._starts.append(row + extra)
+            self._details.append(details)
+            extra += len(details)
+        self._extra = extra
+
+    def display_row(self, row):
+        """Display row of an execution row."""
+        k = bisect.bisect_left(self._expanded_rows, row)
+        return self._starts[k] - self._expanded_rows[k] + row if k < len(self._starts) else row + self._extra
+
+    def _locate(self, display_row):
+        """(execution row, None) or (expanded execution row, detail) of a display row."""
+        k = bisect.bisect_right(self._starts, display_row) - 1
+        if k < 0:
+            return display_row, None
+        offset = display_row - self._starts[k]
+        details = self._details[k]
+        if offset == 0:
+            return self._expanded_rows[k], None
+        if offset <= len(details):
+            return self._expanded_rows[k], details[offset - 1]
+        return self._expanded_rows[k] + offset - len(details), None
+
+    def is_expanded(self, display_row):
+        row, detail = self._locate(display_row)
+        if detail is None:
+            return row in self.expanded
+        return detail[2] is not None and detail[2] in self.expanded[row][1]
+
+    def set_expanded(self, display_row, expand):
+        """Expand or collapse the execution or table at display_row."""
+        if self.messages is not None or self.is_expanded(display_row) == expand:
+            return
+        row, detail = self._locate(display_row)
+        if detail is None:
+            execution = self.execution(row)
+            if expand:
+                changed = len(br_tables(execution))
+            else:
+                changed = len(self._details[self._expanded_rows.index(row)])
+        elif detail[2] is None:
+            return
+        else:
+            execution, tables = self.expanded[row]
+            changed = sum(map(len, list(br_tables(execution).values())[detail[2]]))
+
+        first, last = display_row + 1, display_row + changed
+        if changed:
+            if expand:
+                self.beginInsertRows(QModelIndex(), first, last)
+            else:
+                self.beginRemoveRows(QModelIndex(), first, last)
+
+        if detail is None and expand:
+            self.expanded[row] = (execution, set())
+        elif detail is None:
+            del self.expanded[row]
+        elif expand:
+            tables.add(detail[2])
+        else:
+            tables.discard(detail[2])
+        self._spans()
+
+        if changed:
+            if expand:
+                self.endInsertRows()
+            else:
+                self.endRemoveRows()
+        index = self.index(display_row, 0)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    # -----------------------------
+    # QAbstractTableModel
+    # -----------------------------
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.messages is not None:
+            return len(self.messages)
+        return self.count + self._extra
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return f"Business Rules ({self.count:,})" if self.count else "Business Rules"
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if self.messages is not None:
+            return self.messages[index.row()] if role == Qt.DisplayRole else None
+
+        row, detail = self._locate(index.row())
+        if detail is not None:
+            if role == Qt.DisplayRole:
+                depth, text, table = detail
+                if table is None:
+                    return _INDENT * depth + "  " + text
+                arrow = "▾" if table in self.expanded[row][1] else "▸"
+                return f"{_INDENT * depth}{arrow} {text}"
+            return None
+
+        execution = self.execution(row)
+        if role == Qt.DisplayRole:
+            ts = execution["timestamp"]
+            arrow = "▾" if row in self.expanded else "▸"
+            return f"{arrow} {ts.strftime('%H:%M:%S.%f')[:-3]}  {execution['br_name']}"
+        if role == Qt.UserRole:
+            return execution
+        if role == Qt.BackgroundRole:
+            if id(execution) in self.highlighted:
+                return QBrush(Qt.yellow)
+            if execution.get("br_name") == EXCEPTION_BR:
+                return QBrush(QColor("red"))
+        if role == Qt.ForegroundRole:
+            if id(execution) not in self.highlighted and execution.get("br_name") == EXCEPTION_BR:
+                return QBrush(QColor("white"))
+        return None
\ No newline at end of file
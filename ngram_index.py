@@ -0,0 +1,89 @@
+# ngram_index.py
+"""
+Trigram index for substring search.
+
+Each distinct 3-character (or 3-byte) slice of a document maps to the
+sorted ids of the documents that contain it. A search term of length 3
+or more can only occur in documents holding all of its trigrams, so
+intersecting those postings leaves a short candidate list to verify.
+"""
+import bisect
+from array import array
+
+N = 3
+
+# Logs up to this size get an index, built by the first search for a
+# substring that is not a whole token; it costs roughly 150 bytes of
+# memory per indexed line.
+INDEX_MAX_FILE_BYTES = 128 * 1024 * 1024
+
+
+def _grams(text, start=0):
+    return {text[i:i + N] for i in range(start, len(text) - N + 1)}
+
+
+class TrigramIndex:
+    """Trigram → sorted array of document ids (rows or execution positions)."""
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, doc_id, text, start=0):
+        """Index text (str or lowered bytes) from start; ids must be added in order."""
+        postings = self.postings
+        get = postings.get
+        for gram in _grams(text, start):
+            ids = get(gram)
+            if ids is None:
+                postings[gram] = array("I", (doc_id,))
+            else:
+                ids.append(doc_id)
+
+    def extend(self, other, base):
+        """Merge another index whose ids follow this one's, shifted by base."""
+        for gram, ids in other.postings.items():
+            if base:
+                ids = array("I", map(base.__add__, ids))
+            mine = self.postings.get(gram)
+            if mine is None:
+                self.postings[gram] = ids
+            else:
+                mine.extend(ids)
+
+    def renumber(self, new_id):
+        """Apply a permutation given as new_id[old_id]."""
+        remap = new_id.__getitem__
+        self.postings = {
+            gram: array("I", sorted(map(remap, ids)))
+            for gram, ids in self.postings.items()
+        }
+
+    def renumber_from(self, lo, new_id):
+        """Apply new_id[old_id - lo] to the ids from lo on; ids below lo stay."""
+        for ids in self.postings.values():
+            if ids[-1] < lo:
+                continue
+            k = bisect.bisect_left(ids, lo)
+            ids[k:] = array("I", sorted(new_id[i - lo] for i in ids[k:]))
+
+    def candidates(self, term, lo=0, hi=None):
+        """Sorted ids in [lo, hi) that may contain term, or None if term is too short."""
+        if len(term) < N:
+            return None
+
+        found = None
+        postings = self.postings
+        for gram in sorted(_grams(term), key=lambda g: len(postings.get(g, ()))):
+            ids = postings.get(gram)
+            if ids is None:
+                return array("I")
+            ids = ids[bisect.bisect_left(ids, lo):
+                      len(ids) if hi is None else bisect.bisect_left(ids, hi)]
+            if found is None:
+                found = ids
+            else:
+                keep = set(ids)
+                found = array("I", [i for i in found if i in keep])
+            if not found:
+                break
+        return found
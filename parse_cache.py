@@ -0,0 +1,122 @@
+# parse_cache.py
+"""
+On-disk cache of parsed log results.
+
+Entries are keyed by the log's identity (absolute path, size, mtime and a
+hash of its first and last bytes) and by PARSER_VERSION, so an edited log
+or a changed parser never hits a stale entry. The cache directory is kept
+under CACHE_MAX_BYTES by evicting the least recently used entries.
+"""
+import hashlib
+import os
+import pickle
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".eif_log_viewer", "parse_cache")
+CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+
+# Bump whenever a worker's parsed output changes shape or content
+PARSER_VERSION = 16
+
+# Bytes hashed at each end of the log
+HASH_PROBE_BYTES = 64 * 1024
+
+_SUFFIX = ".pcache"
+
+
+def cache_key(filepath, kind):
+    """(hex key, size) of a log file for the kind of parse ("variable", "br").
+
+    The key describes the file's first size bytes as of this call. Take it
+    before parsing and parse exactly those bytes, so an entry saved for a
+    log that grew in the meantime never claims lines it does not hold.
+    """
+    st = os.stat(filepath)
+    h = hashlib.sha1()
+    h.update(f"{kind}|{PARSER_VERSION}|{os.path.abspath(filepath)}|"
+             f"{st.st_size}|{st.st_mtime_ns}|".encode("utf-8"))
+
+    with open(filepath, "rb") as f:
+        h.update(f.read(HASH_PROBE_BYTES))
+        if st.st_size > HASH_PROBE_BYTES:
+            f.seek(max(HASH_PROBE_BYTES, st.st_size - HASH_PROBE_BYTES))
+            h.update(f.read())
+
+    return h.hexdigest(), st.st_size
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key + _SUFFIX)
+
+
+def load(key):
+    """Cached result for a cache_key, or None on a miss or unreadable entry."""
+    try:
+        path = _entry_path(key)
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        # Mark as recently used for eviction
+        os.utime(path)
+        return result
+    except Exception:
+        return None
+
+
+def save(key, result):
+    """Store a result under a cache_key; failures only cost the cache entry."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _entry_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        _evict(CACHE_MAX_BYTES)
+    except Exception as e:
+        print(f"⚠ Could not write parse cache: {e}")
+
+
+def _entries():
+    """(mtime, size, path) of every cache entry."""
+    entries = []
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return entries
+
+    for name in names:
+        if not name.endswith(_SUFFIX):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def _evict(max_bytes):
+    """Remove least recently used entries until the cache fits max_bytes."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def clear():
+    """Delete every cache entry; returns the number of bytes freed."""
+    freed = 0
+    for _, size, path in _entries():
+        try:
+            os.remove(path)
+            freed += size
+        except OSError:
+            pass
+    return freed
@@ -0,0 +1,92 @@
+# process_pool.py
+"""
+Application-wide pool of parse processes.
+
+The pool starts on first use and stays warm, so opening the next log
+skips process start-up. Each parse takes a Lease for as long as it
+submits work; concurrent leases split the workers evenly instead of
+each queueing cpu_count() chunks at once.
+"""
+import atexit
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_lock = threading.Lock()
+_executor = None
+_leases = 0
+
+
+def worker_count():
+    return multiprocessing.cpu_count()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=worker_count())
+        return _executor
+
+
+def _discard(executor):
+    """Drop a broken pool so the next lease starts a fresh one."""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker processes; the pool restarts if used again."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class Lease:
+    """One parse's share of the pool, used as a context manager."""
+
+    def __enter__(self):
+        global _leases
+        with _lock:
+            _leases += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _leases
+        with _lock:
+            _leases -= 1
+        return False
+
+    def share(self):
+        """Workers this lease may keep busy now; changes as leases come and go."""
+        return max(1, worker_count() // max(1, _leases))
+
+    def starmap(self, fn, arg_tuples):
+        """Yield fn(*args) for each argument tuple, in order.
+
+        At most share() calls are in flight at a time, so another lease
+        started meanwhile gets workers as soon as earlier calls finish.
+        """
+        executor = _get_executor()
+        pending = deque()
+        try:
+            for args in arg_tuples:
+                while len(pending) >= self.share():
+                    yield pending.popleft().result()
+                pending.append(executor.submit(fn, *args))
+            while pending:
+                yield pending.popleft().result()
+        except BrokenProcessPool:
+            _discard(executor)
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
@@ -4,7 +4,7 @@
 - _populate_sequence_tree()
 - 시퀀스 클릭 → 로그 필터 + BR 하이라이트
 """
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QTreeWidgetItem
@@ -106,25 +106,24 @@ class SequenceController:
 
         if seq["type"] == "B":
             core_set   = set(seq.get("core_indices", []))
-            final_logs = []
+            final_rows = []
             for log in logs_in_range:
                 item_c, signal = _parse_item_signal(log.raw)
                 if item_c != item_code:
                     continue
                 if log.original_index in core_set:
-                    final_logs.append(log)
+                    final_rows.append(log.row)
                     continue
                 if "B_TRIGGER_REPORT" in (signal or ""):
                     continue
-                final_logs.append(log)
-            final_logs.sort(key=lambda x: x.ts or datetime.min)
-            self._lc.display_logs(final_logs)
+                final_rows.append(log.row)
+            self._lc.display_logs(self._lc.variable_logs.subset(final_rows))
         else:
             subset = [
-                log for log in logs_in_range
+                log.row for log in logs_in_range
                 if _parse_item_signal(log.raw)[0] == item_code
             ]
-            self._lc.display_logs(subset)
+            self._lc.display_logs(self._lc.variable_logs.subset(subset))
 
         # BR 연동
         br_tab = self.page.br_tab
@@ -137,11 +136,9 @@ class SequenceController:
             return
 
         buffer_sec = 1
-        to_highlight = [
-            e for e in br_tab.br_calls
-            if e["br_name"] in expected_brs
-            and (st_ts - buffer_sec) <= int(e["timestamp"].timestamp()) <= (et_ts + buffer_sec)
-        ]
+        to_highlight = br_tab.executions_in_seconds(
+            st_ts - buffer_sec, et_ts + buffer_sec, expected_brs
+        )
         if to_highlight:
             self.page.pending_br_highlight = to_highlight
 
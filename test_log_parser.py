@@ -0,0 +1,207 @@
+# test_log_parser.py
+"""Chunked parsing must give exactly what one pass over the file does."""
+import json
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import log_parser
+
+BR_NAMES = ["BR_EQP_REG_EIOSTATE", "BR_PRD_GET_NEW_LOTID_MX", "BR_SYS_REG_BIZRULE_EXCEPTION"]
+
+
+def _write_br_log(path, count, seed):
+    """Synthetic BR log with replies that lag their requests by several executions."""
+    rnd = random.Random(seed)
+    t = datetime(2024, 1, 15, 8, 0, 0)
+    lines = []
+    pending = []
+
+    def stamp():
+        return t.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    for i in range(count):
+        t += timedelta(milliseconds=rnd.randint(0, 900))
+        uuid = "%08x-21b1-426e-8b28-%012x" % (rnd.getrandbits(32), i)
+        name = rnd.choice(BR_NAMES)
+        ref = json.dumps({"IN_EQP": [{"EQPTID": "A1EROL101", "LOTID": "LOT%06d" % i, "QTY": i}]})
+        lines.append(f"{stamp()} [Info] [A1EROL101] BIZRULE] {name}")
+        lines.append(f"{stamp()} [Info] [A1EROL101] (REQUESTQ) PROC_TYPE/LGES_PRD_MES/MES_EIF/ELTR({uuid}) : {{")
+        lines.append(f'  "actID": "{name}",')
+        lines.append(f'  "refDS": {json.dumps(ref)},')
+        lines.append('  "nested": {"a": {"b": 1}},')
+        lines.append(f'  "TXN_ID": "{i}"')
+        lines.append("}")
+        pending.append((uuid, name))
+
+        while pending and rnd.random() < 0.5:
+            uuid, name = pending.pop(rnd.randrange(len(pending)))
+            t += timedelta(milliseconds=rnd.randint(0, 300))
+            reply = json.dumps({"actID": name, "OUT_DATA": [{"RESULT": "OK", "N": None}]})
+            lines.append(f"{stamp()} [Info] [A1EROL101] (RECEIVE_REPLYQ) REPLY/PROC_TYPE/ELTR({uuid}) : {reply}")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("﻿" + "\n".join(lines) + "\n")
+
+
+def _single_pass(path):
+    parser = log_parser._BRParser()
+    for line in log_parser._iter_byte_range(path, 0, os.path.getsize(path)):
+        line = line.rstrip()
+        if line:
+            parser.feed(line)
+    return log_parser._BRMergeState.from_parser(parser)
+
+
+def _chunked(path, num_chunks):
+    state = log_parser._BRMergeState()
+    for start, end in log_parser._split_file_by_bytes(path, num_chunks):
+        state.merge(log_parser._process_br_chunk(path, start, end))
+    return state
+
+
+def _summary(state):
+    return (
+        [(e["timestamp"], e["br_name"], log_parser.br_tables(e)) for e in state.br_calls],
+        state.full_br_index,
+        list(state.time_index.ts),
+        list(state.time_index.positions),
+    )
+
+
+class BRChunkParityTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        _write_br_log(self.path, 400, seed=3)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunked_matches_single_pass(self):
+        expected = _summary(_single_pass(self.path))
+        self.assertGreater(len(expected[0]), 300)
+
+        for num_chunks in (1, 2, 3, 7, 16, 64):
+            with self.subTest(num_chunks=num_chunks):
+                self.assertEqual(_summary(_chunked(self.path, num_chunks)), expected)
+
+
+SYSTEMS = ["A1EROL101.Elm", "A1EROL101.RollMapElm", "A1EROL101.RMSElm", "DNC1_1.IO_DNC"]
+ITEMS = ["C2_1_EQP_STAT_CHG_RPT", "G3_1_LOT_INFO_REQ", "G3_5_APD_RPT", "RM_1_REQ"]
+B_STEPS = [
+    ("O_B_TRIGGER_REPORT", "ON"), ("I_B_TRIGGER_REPORT_CONF", "ON"),
+    ("O_B_TRIGGER_REPORT", "OFF"), ("I_B_TRIGGER_REPORT_CONF", "OFF"),
+]
+
+
+def _write_variable_log(path, count, seed):
+    """Synthetic variable log: handshakes spread over many lines, some out of order."""
+    rnd = random.Random(seed)
+    t = datetime(2024, 1, 15, 8, 0, 0)
+    steps = {}
+    lines = []
+    for _ in range(count):
+        t += timedelta(seconds=rnd.choice([0, 0, 1]))
+        ts = t - timedelta(seconds=rnd.randint(1, 4)) if rnd.random() < 0.05 else t
+        item = rnd.choice(ITEMS)
+        r = rnd.random()
+        if r < 0.4:
+            step = steps.get(item, 0)
+            signal, value = B_STEPS[step]
+            # Now and then a handshake is cut short or restarted
+            steps[item] = rnd.randrange(4) if rnd.random() < 0.05 else (step + 1) % 4
+        elif r < 0.5:
+            signal, value = "O_W_TRIGGER_REPORT", rnd.choice(["ON", "OFF"])
+        elif r < 0.55:
+            signal, value = "I_W_TRIGGER_REPORT_ACK", rnd.choice(["1", "11"])
+        else:
+            signal, value = rnd.choice(["LOTID", "QTY"]), "LOT%06d" % rnd.randrange(10 ** 6)
+        line = f"{ts:%Y-%m-%d %H:%M:%S} [{rnd.choice(SYSTEMS)}][{item}:{signal}] : {value}"
+        if rnd.random() < 0.01:
+            line = "garbage line"
+        elif rnd.random() < 0.01:
+            line = ""
+        lines.append(line)
+
+    with open(path, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write("\ufeff" + "\n".join(lines) + "\n")
+
+
+def _variable_state(path, ranges):
+    state = log_parser._VariableMergeState()
+    for start, end in ranges:
+        state.merge(log_parser._process_variable_chunk(path, start, end))
+    state.finish()
+    return state
+
+
+def _variable_summary(state):
+    store = state.store
+    return (
+        [(store.ts[r], store.line_no[r], store.raw(r), store.item_code(r)) for r in range(len(store))],
+        {token: list(rows) for token, rows in store.token_rows.items()},
+        {code: list(rows) for code, rows in state.item_rows.items()},
+        state.item_categories,
+        state.eqp_set,
+        (state.skipped, state.line_count),
+        state.builder.sequences,
+        state.builder.anomalies(lambda item: 30),
+    )
+
+
+class VariableChunkParityTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        _write_variable_log(self.path, 3000, seed=5)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunked_matches_single_pass(self):
+        expected = _variable_summary(_variable_state(self.path, [(0, os.path.getsize(self.path))]))
+        self.assertGreater(len(expected[0]), 2500)
+        self.assertTrue(expected[6])
+
+        for num_chunks in (2, 3, 7, 16, 64):
+            with self.subTest(num_chunks=num_chunks):
+                ranges = log_parser._split_file_by_bytes(self.path, num_chunks)
+                self.assertGreater(len(ranges), 1)
+                self.assertEqual(_variable_summary(_variable_state(self.path, ranges)), expected)
+
+
+class BRTablesTest(unittest.TestCase):
+    def _tables(self, request, reply):
+        return log_parser.br_tables({"request": request, "reply": reply})
+
+    def test_tables_from_request_and_reply(self):
+        request = json.dumps({"refDS": json.dumps({"IN_EQP": [{"LOTID": "L1", "QTY": 3}]})})
+        reply = json.dumps({"OUT_DATA": [{"RESULT": "OK", "N": None}], "actID": "BR_X"})
+        self.assertEqual(self._tables(request, reply), {
+            "IN_EQP": [{"LOTID": "L1", "QTY": "3"}],
+            "OUT_DATA": [{"RESULT": "OK", "N": ""}],
+        })
+
+    def test_malformed_parts_are_left_out(self):
+        cases = [
+            ("[1, 2]", "null"),
+            ('{"refDS": 5}', '"text"'),
+            ('{"refDS": "[1]"}', '{"OUT_DATA": "OK"}'),
+            ('{"refDS": "{\\"IN\\": 7}"}', '{"OUT_DATA": [1, "x"]}'),
+            ("{", "}"),
+        ]
+        for request, reply in cases:
+            with self.subTest(request=request, reply=reply):
+                tables = self._tables(request, reply)
+                self.assertTrue(all(rows == [] for rows in tables.values()), tables)
+
+    def test_nested_refds_object(self):
+        request = json.dumps({"refDS": {"IN_EQP": [{"A": 1}, "junk"]}})
+        self.assertEqual(self._tables(request, None), {"IN_EQP": [{"A": "1"}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# test_log_store.py
+"""LogStore.search must agree with a plain substring scan of the lines."""
+import random
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from log_store import LogStore
+
+WORDS = [
+    "ON", "OFF", "CONF", "I_B_TRIGGER_REPORT_CONF", "W_TRIGGER_REPORT", "W_TRIGGER_REPORT_ACK",
+    "LOT123", "LOT1234", "LOTID", "A1EROL101.Elm", "ITEM_A", "ITEM_AB", "QTY=15", "x-ray",
+]
+
+QUERIES = [
+    ["on"], ["off"], ["conf"], ["w_trigger_report"], ["lot123"], ["lot"], ["lotid"],
+    ["ot12"], ["item_a"], ["rol10"], ["=15"], ["y=1"], ["x-r"], ["08:00"], ["15 08"],
+    ["zzz"], ["a"], ["on", "lot"], ["report", "ack"], ["item_a", "=15"],
+]
+
+
+def _make_store(trigrams, seed):
+    rnd = random.Random(seed)
+    store = LogStore(trigrams=trigrams)
+    block = store.block_id("S", "EQP")
+    t = datetime(2024, 1, 15, 8, 0, 0)
+    lines = []
+    for i in range(600):
+        t += timedelta(seconds=rnd.randint(0, 3))
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 4)))
+        line = f"{t:%Y-%m-%d %H:%M:%S} [{text}] : {rnd.choice(WORDS)}"
+        store.append(t.timestamp(), i, line.encode("utf-8"), "ITEM", block)
+        lines.append(line.casefold())
+    return store, lines
+
+
+class SearchMatchesScanTest(unittest.TestCase):
+    def _check(self, store, lines):
+        hi = len(lines)
+        for terms in QUERIES:
+            for and_terms, or_terms in ((terms, []), ([], terms), (terms[:1], terms[1:])):
+                expected = [
+                    row for row, line in enumerate(lines)
+                    if all(t in line for t in and_terms)
+                    and (not or_terms or any(t in line for t in or_terms))
+                ]
+                with self.subTest(and_terms=and_terms, or_terms=or_terms):
+                    self.assertEqual(list(store.search(and_terms, or_terms)), expected)
+                    streamed = [
+                        row for rows in store.iter_search(and_terms, or_terms, 0, hi, batch_rows=97)
+                        for row in rows
+                    ]
+                    self.assertEqual(streamed, expected)
+
+    def test_search_without_trigrams(self):
+        self._check(*_make_store(False, seed=1))
+
+    def test_search_with_trigrams(self):
+        self._check(*_make_store(True, seed=2))
+
+    def test_search_with_trigrams_built_on_demand(self):
+        store, lines = _make_store(False, seed=3)
+        store.index_on_demand = True
+        self._check(store, lines)
+        self.assertIsNotNone(store.trigrams)
+
+    def test_concurrent_searches_build_one_index(self):
+        store, lines = _make_store(False, seed=4)
+        store.index_on_demand = True
+        builds = []
+        index_trigrams = store._index_trigrams
+
+        def counted(index, first):
+            builds.append(first)
+            # Keep the build running while the other searches start
+            time.sleep(0.05)
+            index_trigrams(index, first)
+
+        store._index_trigrams = counted
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(list(store.search(["y=1"], []))))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(builds, [0])
+        expected = [row for row, line in enumerate(lines) if "y=1" in line]
+        self.assertEqual(results, [expected] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# test_model.py
+"""BRExecutionModel must keep expanded executions in place as rows arrive."""
+import json
+import os
+import unittest
+from array import array
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, Qt
+
+from log_parser import BRTimeIndex
+from log_store import LogStore, remap_rows
+from model import BRExecutionModel, LogListModel
+
+_app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def _execution(name, ts_val):
+    ref = json.dumps({"IN_" + name: [{"KEY": name.lower()}]})
+    return {
+        "timestamp": datetime.fromtimestamp(ts_val),
+        "ts_val": ts_val,
+        "br_name": name,
+        "request": json.dumps({"actID": name, "refDS": ref}),
+        "reply": "{}",
+    }
+
+
+class BRModelGrowTest(unittest.TestCase):
+    def setUp(self):
+        self.br_calls = [_execution("A", 1.0), _execution("B", 5.0)]
+        self.time_index = BRTimeIndex(self.br_calls)
+        self.model = BRExecutionModel()
+        self.model.set_executions(self.br_calls, self.time_index)
+        self.model.set_expanded(1, True)
+
+        self.signals = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.signals.append(("insert", first, last)))
+        self.model.modelReset.connect(lambda: self.signals.append(("reset",)))
+
+    def _append(self, *executions):
+        first = len(self.br_calls)
+        self.br_calls.extend(executions)
+        self.time_index.extend(list(executions), first)
+        self.model.grow(min(e["ts_val"] for e in executions))
+
+    def _texts(self):
+        model = self.model
+        return [model.data(model.index(row, 0), Qt.DisplayRole) for row in range(model.rowCount())]
+
+    def test_out_of_order_append_keeps_expanded_execution(self):
+        self._append(_execution("C", 3.0))
+
+        self.assertEqual(self.signals, [("reset",)])
+        texts = self._texts()
+        self.assertEqual(len(texts), 4)
+        self.assertTrue(texts[0].endswith("A") and texts[0].startswith("▸"))
+        self.assertTrue(texts[1].endswith("C") and texts[1].startswith("▸"))
+        self.assertTrue(texts[2].endswith("B") and texts[2].startswith("▾"))
+        self.assertIn("IN_B", texts[3])
+
+    def test_later_append_inserts_rows(self):
+        self._append(_execution("D", 7.0), _execution("E", 6.0))
+
+        self.assertEqual(self.signals, [("insert", 3, 4)])
+        texts = self._texts()
+        self.assertTrue(texts[2].startswith("  ") and "IN_B" in texts[2])
+        self.assertTrue(texts[3].endswith("E") and texts[4].endswith("D"))
+
+
+class LogListRenumberTest(unittest.TestCase):
+    def test_renumbered_rows_repaint(self):
+        store = LogStore()
+        block = store.block_id("S", "EQP")
+        for i, ts in enumerate((1.0, 5.0, 9.0)):
+            store.append(ts, i, f"line {i}".encode(), "ITEM", block)
+        model = LogListModel(store.view(array("I", [1, 2])))
+
+        store.append(3.0, 3, b"line 3", "ITEM", block)
+        lo, new_row = store.merge_tail(3)
+        changed = []
+        model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+        model.renumberRows(remap_rows(model.logs.rows, lo, new_row))
+
+        self.assertEqual(changed, [(0, 1)])
+        texts = [model.data(model.index(row), Qt.DisplayRole) for row in range(model.rowCount())]
+        self.assertEqual(texts, ["line 1", "line 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()